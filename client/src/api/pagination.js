@@ -0,0 +1,24 @@
+import axios from 'axios';
+
+// List endpoints return one page at a time (at most `limit` rows) and put
+// the cursor of the next page in the X-Next-Cursor response header.
+const NEXT_CURSOR_HEADER = 'x-next-cursor';
+const PAGE_SIZE = 1000;
+
+/**
+ * Fetch every page of a list endpoint by following X-Next-Cursor.
+ * @param {string} url
+ * @param {object} config Axios request config (e.g. auth headers)
+ * @returns {Promise<Array>} All rows, in the endpoint's order
+ */
+export const getAllPages = async (url, config = {}) => {
+  const rows = [];
+  let cursor;
+  do {
+    const params = { ...config.params, limit: PAGE_SIZE, ...(cursor ? { cursor } : {}) };
+    const response = await axios.get(url, { ...config, params });
+    rows.push(...response.data);
+    cursor = response.headers[NEXT_CURSOR_HEADER];
+  } while (cursor);
+  return rows;
+};
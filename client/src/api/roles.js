@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { getAllPages } from './pagination';
 
 const API_URL = 'http://localhost:8000/api/v1'; // adjust if needed
 
@@ -13,8 +14,7 @@ const getAuthHeaders = () => {
 
 export const getRoles = async () => {
   try {
-    const response = await axios.get(`${API_URL}/roles`, getAuthHeaders());
-    return response.data;
+    return await getAllPages(`${API_URL}/roles`, getAuthHeaders());
   } catch (error) {
     throw error.response?.data || error;
   }
@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { getAllPages } from './pagination';
 
 const API_URL = 'http://localhost:8000/api/v1';
 
@@ -13,8 +14,7 @@ const getAuthHeaders = () => {
 
 export const getUsers = async () => {
   try {
-    const response = await axios.get(`${API_URL}/users`, getAuthHeaders());
-    return response.data;
+    return await getAllPages(`${API_URL}/users`, getAuthHeaders());
   } catch (error) {
     throw error.response?.data || error;
   }
@@ -63,3 +63,12 @@ export const deleteUser = async (userId) => {
     throw error.response?.data || error;
   }
 };
+
+export const bulkUserAction = async (action, payload) => {
+  try {
+    const response = await axios.post(`${API_URL}/users/bulk/${action}`, payload, getAuthHeaders());
+    return response.data;
+  } catch (error) {
+    throw error.response?.data || error;
+  }
+};
@@ -12,10 +12,16 @@ export function createWorkflow(payload) {
 }
 
 /**
- * Execute a workflow definition.
- * @param {{ graph_json: string }} payload
- * @returns {Promise} Axios response with execution result
+ * Queue an ad-hoc run of a workflow graph and wait for it to finish.
+ * @param {{ nodes: Array; edges: Array; initial_inputs?: object }} payload
+ * @param {number} pollMs Delay between status checks
+ * @returns {Promise<object>} The finished run, with its result or error
  */
-export function executeWorkflow(payload) {
-  return axios.post(`${BASE_URL}/execute`, payload);
-}
\ No newline at end of file
+export async function runWorkflow(payload, pollMs = 1000) {
+  let { data: run } = await axios.post(`${BASE_URL}/runs`, payload);
+  while (run.status === 'queued' || run.status === 'running') {
+    await new Promise(resolve => setTimeout(resolve, pollMs));
+    ({ data: run } = await axios.get(`${BASE_URL}/runs/${run.id}`));
+  }
+  return run;
+}
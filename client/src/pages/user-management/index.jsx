@@ -8,7 +8,7 @@ import UserModal from './components/UserModal';
 import BulkActions from './components/BulkActions';
 import Icon from '../../components/AppIcon';
 import Button from '../../components/ui/Button';
-import { getUsers, createUser, updateUser, deleteUser } from '../../api/users';
+import { getUsers, createUser, updateUser, deleteUser, bulkUserAction } from '../../api/users';
 import { useAuth } from '../../context/AuthContext';
 
 const UserManagement = () => {
@@ -152,12 +152,11 @@ const UserManagement = () => {
 
   const handleBulkAction = async (actionId, userIds) => {
     try {
+      if (actionId === 'activate' || actionId === 'deactivate') {
+        await bulkUserAction(actionId, { user_ids: userIds });
+      }
       for (const userId of userIds) {
-        if (actionId === 'activate') {
-          await updateUser(userId, { status: 'active' });
-        } else if (actionId === 'deactivate') {
-          await updateUser(userId, { status: 'inactive' });
-        } else if (actionId === 'reset_password') {
+        if (actionId === 'reset_password') {
           // Call reset password API for each user
           // await axios.post(`${API_URL}/users/${userId}/reset-password`, {}, getAuthHeaders());
           console.log('Bulk password reset initiated for:', userId);
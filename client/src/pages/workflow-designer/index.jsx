@@ -6,7 +6,7 @@ import WorkflowCanvas from './components/WorkflowCanvas';
 import PropertiesPanel from './components/PropertiesPanel';
 import WorkflowToolbar from './components/WorkflowToolbar';
 import ValidationPanel from './components/ValidationPanel';
-import { createWorkflow, executeWorkflow } from '../../api/workflows';
+import { createWorkflow, runWorkflow } from '../../api/workflows';
 
 const WorkflowDesigner = () => {
   const [selectedElement, setSelectedElement] = useState(null);
@@ -42,9 +42,9 @@ const WorkflowDesigner = () => {
   const handleTestWorkflow = async () => {
     console.log('Testing workflow...', workflowElements);
     try {
-      const payload = { graph_json: JSON.stringify({ nodes: workflowElements }) };
-      const response = await executeWorkflow(payload);
-      setTestResult(response.data);
+      const nodes = workflowElements.map(({ id, type, ...data }) => ({ id, type, data }));
+      const run = await runWorkflow({ nodes, edges: [] });
+      setTestResult(run);
     } catch (error) {
       console.error('Error executing workflow:', error);
       setTestResult({ error: error.toString() });
@@ -1,10 +1,12 @@
 from typing import Any, Dict, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlmodel import Session, select
 
 from db.session import get_session
 from db.models import Ticket, Message, User
 from core.dependencies import get_current_active_user
+from core.pagination import KeysetParams, keyset_page, keyset_query
+from core.response_cache import response_cache, table_versions
 router = APIRouter()
 
 # AgentConfig CRUD endpoints
@@ -22,15 +24,22 @@ def create_agent_config(
     session.add(cfg)
     session.commit()
     session.refresh(cfg)
+    table_versions.bump("agent_config")
     return cfg
 
 @router.get("/configs", response_model=List[AgentConfigRead])
 def read_agent_configs(
+    request: Request,
+    page: KeysetParams = Depends(),
     session: Session = Depends(get_session),
     _: None = Depends(get_current_active_admin),
 ):
-    configs = session.exec(select(AgentConfig)).all()
-    return configs
+    def load(response: Response):
+        session.use_primary()
+        order = (AgentConfig.id,)
+        configs = session.exec(keyset_query(select(AgentConfig), order, page)).all()
+        return keyset_page(configs, order, page, response)
+    return response_cache.respond(request, ("agent_config",), List[AgentConfigRead], load)
 
 @router.get("/configs/{config_id}", response_model=AgentConfigRead)
 def read_agent_config(
@@ -59,6 +68,7 @@ def update_agent_config(
     session.add(cfg)
     session.commit()
     session.refresh(cfg)
+    table_versions.bump("agent_config")
     return cfg
 
 @router.delete("/configs/{config_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -72,4 +82,5 @@ def delete_agent_config(
         raise HTTPException(status_code=404, detail="AgentConfig not found")
     session.delete(cfg)
     session.commit()
+    table_versions.bump("agent_config")
     return None
@@ -1,20 +1,50 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session
-from db.session import get_session
-from core.dependencies import authenticate_user, create_access_token
-from api.v1.schemas.token import Token
+from jose import JWTError
+from sqlmodel.ext.asyncio.session import AsyncSession
+from db.session import get_async_session
+from db.models import User
+from core.dependencies import (
+    authenticate_user,
+    create_refresh_token,
+    decode_refresh_token,
+    issue_access_token,
+)
+from api.v1.schemas.token import RefreshRequest, Token
 
 router = APIRouter()
 
 @router.post("/token", response_model=Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(get_session)):
-    user = authenticate_user(session, form_data.username, form_data.password)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_async_session)):
+    user = await authenticate_user(session, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(sub=user.email)
-    return {"access_token": access_token, "token_type": "bearer"}
+    access_token = issue_access_token(user)
+    refresh_token = create_refresh_token(user)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(refresh_in: RefreshRequest, session: AsyncSession = Depends(get_async_session)):
+    """
+    Exchange a refresh token for a new access/refresh pair. This is the
+    only point where stateless tokens are re-checked against the database.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = decode_refresh_token(refresh_in.refresh_token)
+    except JWTError:
+        raise credentials_exception
+    user = await session.get(User, payload["uid"])
+    if not user or user.token_version != payload.get("ver") or user.status != "active":
+        raise credentials_exception
+    access_token = issue_access_token(user)
+    refresh_token = create_refresh_token(user)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
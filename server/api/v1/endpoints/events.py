@@ -0,0 +1,128 @@
+import asyncio
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.requests import HTTPConnection
+
+from db.session import async_engine
+from db.models import Ticket, User
+from core.dependencies import get_current_principal, is_admin
+from core.events import Subscription, event_hub
+
+router = APIRouter()
+
+KEEPALIVE_SECONDS = 15
+# Close code for a subscriber dropped for falling behind ("try again later").
+WS_SLOW_CONSUMER = 1013
+
+def _bearer_token(conn: HTTPConnection) -> Optional[str]:
+    # Browsers cannot set headers on WebSocket/EventSource, so a
+    # `?token=` query parameter is accepted as well.
+    token = conn.query_params.get("token")
+    if token:
+        return token
+    scheme, _, value = conn.headers.get("authorization", "").partition(" ")
+    return value if scheme.lower() == "bearer" and value else None
+
+async def _authorize(conn: HTTPConnection, ticket_id: Optional[int] = None) -> str:
+    """
+    Authenticate the connection and return the channel it may follow:
+    a ticket the caller can see, or the caller's inbox (every ticket for
+    admins).
+    """
+    token = _bearer_token(conn)
+    if token is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        user: User = (await get_current_principal(token, session)).user
+        if user.status != "active":
+            raise HTTPException(status_code=400, detail="Inactive user")
+        if ticket_id is None:
+            return "inbox:all" if is_admin(user) else f"inbox:{user.id}"
+        ticket = await session.get(Ticket, ticket_id)
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    if not is_admin(user) and ticket.user_id != user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return f"ticket:{ticket_id}"
+
+async def _serve_websocket(websocket: WebSocket, ticket_id: Optional[int] = None) -> None:
+    try:
+        channel = await _authorize(websocket, ticket_id)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    subscription = event_hub.subscribe([channel])
+
+    async def watch_disconnect():
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            event_hub.unsubscribe(subscription)
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        while (payload := await subscription.queue.get()) is not None:
+            await websocket.send_text(payload.decode())
+        if subscription.dropped:
+            await websocket.close(code=WS_SLOW_CONSUMER, reason="Slow consumer")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
+        event_hub.unsubscribe(subscription)
+
+async def _sse_stream(subscription: Subscription) -> AsyncIterator[bytes]:
+    try:
+        while True:
+            try:
+                payload = await asyncio.wait_for(subscription.queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            if payload is None:
+                if subscription.dropped:
+                    yield b"event: dropped\ndata: {}\n\n"
+                return
+            yield b"data: " + payload + b"\n\n"
+    finally:
+        event_hub.unsubscribe(subscription)
+
+async def _serve_sse(request: Request, ticket_id: Optional[int] = None) -> StreamingResponse:
+    channel = await _authorize(request, ticket_id)
+    return StreamingResponse(
+        _sse_stream(event_hub.subscribe([channel])),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/tickets/{ticket_id}/ws")
+async def ticket_events_ws(websocket: WebSocket, ticket_id: int):
+    """
+    Live `message.created` / `ticket.updated` events for one ticket.
+    """
+    await _serve_websocket(websocket, ticket_id)
+
+@router.websocket("/inbox/ws")
+async def inbox_events_ws(websocket: WebSocket):
+    """
+    Live events for every ticket in the caller's inbox.
+    """
+    await _serve_websocket(websocket)
+
+@router.get("/tickets/{ticket_id}/sse")
+async def ticket_events_sse(request: Request, ticket_id: int):
+    """
+    Server-sent events fallback for the ticket channel.
+    """
+    return await _serve_sse(request, ticket_id)
+
+@router.get("/inbox/sse")
+async def inbox_events_sse(request: Request):
+    """
+    Server-sent events fallback for the inbox channel.
+    """
+    return await _serve_sse(request)
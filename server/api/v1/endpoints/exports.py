@@ -0,0 +1,133 @@
+import csv
+import datetime
+import io
+import json
+import zlib
+from enum import Enum
+from typing import Iterator, Optional
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlmodel import select
+
+from db.session import read_engine
+from db.models import Message, Ticket, User
+from core.dependencies import require_permission
+
+router = APIRouter()
+
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"Unserializable value {value!r}")
+
+
+def _stream_rows(query: Select, export_format: ExportFormat) -> Iterator[bytes]:
+    """
+    Encode rows as they arrive from a server-side cursor, one chunk per
+    batch, so memory stays flat regardless of the export size. Exports
+    read from the replica when one is configured.
+    """
+    with read_engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE).execute(query)
+        columns = list(result.keys())
+        if export_format == ExportFormat.csv:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for batch in result.partitions():
+                writer.writerows(
+                    [v.isoformat() if isinstance(v, datetime.datetime) else v for v in row]
+                    for row in batch
+                )
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue().encode()
+        else:
+            for batch in result.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(columns, row)), default=_json_default) + "\n"
+                    for row in batch
+                ).encode()
+
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _export_response(query: Select, name: str, export_format: ExportFormat, gzip: bool) -> StreamingResponse:
+    media_type = "text/csv" if export_format == ExportFormat.csv else "application/x-ndjson"
+    filename = f"{name}.{export_format.value}"
+    body = _stream_rows(query, export_format)
+    if gzip:
+        body = _gzip(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/tickets")
+def export_tickets(
+    format: ExportFormat = ExportFormat.ndjson,
+    status: Optional[str] = None,
+    created_from: Optional[datetime.datetime] = None,
+    created_to: Optional[datetime.datetime] = None,
+    gzip: bool = False,
+    _: User = Depends(require_permission("exports:read")),
+):
+    """
+    Stream every ticket matching the filters as NDJSON or CSV.
+    """
+    query = select(*Ticket.__table__.columns).order_by(Ticket.id)
+    if status:
+        query = query.where(Ticket.status == status)
+    if created_from:
+        query = query.where(Ticket.created_at >= created_from)
+    if created_to:
+        query = query.where(Ticket.created_at < created_to)
+    return _export_response(query, "tickets", format, gzip)
+
+
+@router.get("/messages")
+def export_messages(
+    format: ExportFormat = ExportFormat.ndjson,
+    ticket_id: Optional[int] = None,
+    status: Optional[str] = None,
+    created_from: Optional[datetime.datetime] = None,
+    created_to: Optional[datetime.datetime] = None,
+    gzip: bool = False,
+    _: User = Depends(require_permission("exports:read")),
+):
+    """
+    Stream messages as NDJSON or CSV. `status` filters on the ticket's
+    status; the date range applies to the message timestamp.
+    """
+    query = select(*Message.__table__.columns).order_by(Message.id)
+    if ticket_id:
+        query = query.where(Message.ticket_id == ticket_id)
+    if status:
+        query = query.join(Ticket, Ticket.id == Message.ticket_id).where(Ticket.status == status)
+    if created_from:
+        query = query.where(Message.timestamp >= created_from)
+    if created_to:
+        query = query.where(Message.timestamp < created_to)
+    return _export_response(query, "messages", format, gzip)
@@ -1,84 +1,184 @@
+import datetime
+from collections import defaultdict
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import and_, func, or_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from db.session import get_session
+from db.session import get_async_session
+from db.group_commit import message_writer
 from db.models import Message, Ticket, User
-from api.v1.schemas.message import MessageCreate, MessageRead, MessageUpdate
-from core.dependencies import get_current_active_user, get_current_active_admin
+from api.v1.schemas.message import (
+    MessageCreate,
+    MessageRead,
+    MessageSyncRequest,
+    MessageSyncResult,
+    MessageUpdate,
+)
+from core.pagination import KeysetParams, keyset_page, keyset_query
+from core.responses import json_response, trusted_dicts, trusted_response
+from core.dependencies import get_current_active_user, get_current_active_admin, is_admin
+from core.events import event_hub, ticket_channels
 
 router = APIRouter()
 
+def _visible_to(query, user: User):
+    """
+    Restrict a message query to the caller's own tickets in the same
+    statement instead of checking each message's ticket afterwards.
+    """
+    if is_admin(user):
+        return query
+    return query.join(Ticket, Ticket.id == Message.ticket_id).where(Ticket.user_id == user.id)
+
 @router.post("/", response_model=MessageRead, status_code=status.HTTP_201_CREATED)
-def create_message(
+async def create_message(
     message_in: MessageCreate,
-    session: Session = Depends(get_session),
+    write_behind: bool = Query(
+        False,
+        description="Commit together with other queued messages; answers once the batch is durable.",
+    ),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    ticket = session.get(Ticket, message_in.ticket_id)
+    ticket = await session.get(Ticket, message_in.ticket_id)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
-    if current_user.role.name.lower() != "admin" and ticket.user_id != current_user.id:
+    if not is_admin(current_user) and ticket.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions to post message")
     message = Message(
         ticket_id=message_in.ticket_id,
         sender_type=message_in.sender_type,
         body=message_in.body
     )
+    channels = ticket_channels(ticket.id, ticket.user_id)
+    if write_behind:
+        # Hand the pooled connection back before waiting on the batch.
+        await session.close()
+        stored = await message_writer.insert(message.model_dump(exclude={"id"}))
+        await event_hub.publish(channels, "message.created", stored)
+        return stored
     session.add(message)
-    session.commit()
-    session.refresh(message)
+    await session.commit()
+    await session.refresh(message)
+    await event_hub.publish(channels, "message.created", trusted_dicts([message], MessageRead)[0])
     return message
 
 @router.get("/", response_model=List[MessageRead])
-def read_messages(
+async def read_messages(
+    response: Response,
     ticket_id: Optional[int] = None,
-    session: Session = Depends(get_session),
+    page: KeysetParams = Depends(),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
+    order = (Message.timestamp, Message.id)
     query = select(Message)
     if ticket_id:
         query = query.where(Message.ticket_id == ticket_id)
-    messages = session.exec(query).all()
-    # permission check on retrieval
-    if not current_user.role.name.lower() == "admin":
-        # ensure all messages belong to user's tickets
-        for msg in messages:
-            ticket = session.get(Ticket, msg.ticket_id)
-            if ticket and ticket.user_id != current_user.id:
-                raise HTTPException(status_code=403, detail="Not enough permissions to view messages")
-    return messages
+    query = _visible_to(query, current_user)
+    messages = (await session.exec(keyset_query(query, order, page))).all()
+    return trusted_response(keyset_page(messages, order, page, response), MessageRead, response)
+
+@router.get(
+    "/sync",
+    response_model=List[MessageRead],
+    responses={status.HTTP_204_NO_CONTENT: {"description": "No new messages"}},
+)
+async def sync_messages(
+    ticket_id: int,
+    after_id: Optional[int] = None,
+    since: Optional[datetime.datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Messages of one ticket newer than the last message id (or timestamp)
+    the client has, oldest first; a full page means there may be more.
+    An idle poll is a single index range scan answered with 204.
+    """
+    query = select(Message).where(Message.ticket_id == ticket_id)
+    if after_id is not None:
+        query = query.where(Message.id > after_id)
+    if since is not None:
+        query = query.where(Message.timestamp > since)
+    # Chat polls must see their own writes, never a lagging replica.
+    query = _visible_to(query, current_user).order_by(Message.id).limit(limit).execution_options(use_primary=True)
+    messages = (await session.exec(query)).all()
+    if not messages:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return trusted_response(messages, MessageRead)
+
+@router.post(
+    "/sync",
+    response_model=MessageSyncResult,
+    responses={status.HTTP_204_NO_CONTENT: {"description": "No new messages"}},
+)
+async def sync_messages_batch(
+    sync_in: MessageSyncRequest,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Incremental sync for many tickets in one round trip: new messages
+    per ticket after the given ids, capped at `limit` per ticket.
+    """
+    newer = or_(*(
+        and_(Message.ticket_id == ticket_id, Message.id > after_id)
+        for ticket_id, after_id in sync_in.after_ids.items()
+    ))
+    position = func.row_number().over(partition_by=Message.ticket_id, order_by=Message.id)
+    ranked = _visible_to(select(Message.id, position.label("position")).where(newer), current_user).subquery()
+    query = (
+        select(Message)
+        .join(ranked, ranked.c.id == Message.id)
+        .where(ranked.c.position <= sync_in.limit + 1)
+        .order_by(Message.ticket_id, Message.id)
+    )
+    messages = (await session.exec(query)).all()
+    if not messages:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    by_ticket = defaultdict(list)
+    for message in messages:
+        by_ticket[message.ticket_id].append(message)
+    has_more = [ticket_id for ticket_id, rows in by_ticket.items() if len(rows) > sync_in.limit]
+    return json_response({
+        "messages": {ticket_id: trusted_dicts(rows[:sync_in.limit], MessageRead) for ticket_id, rows in by_ticket.items()},
+        "has_more": has_more,
+    })
 
 @router.put("/{message_id}", response_model=MessageRead)
-def update_message(
+async def update_message(
     message_id: int,
     message_update: MessageUpdate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    message = session.get(Message, message_id)
+    message = await session.get(Message, message_id)
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
-    ticket = session.get(Ticket, message.ticket_id)
-    if current_user.role.name.lower() != "admin" and ticket.user_id != current_user.id:
+    ticket = await session.get(Ticket, message.ticket_id)
+    if not is_admin(current_user) and ticket.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions to update message")
     update_data = message_update.dict(exclude_unset=True)
     for key, val in update_data.items():
         setattr(message, key, val)
     session.add(message)
-    session.commit()
-    session.refresh(message)
+    await session.commit()
+    await session.refresh(message)
     return message
 
 @router.delete("/{message_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_message(
+async def delete_message(
     message_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     _: User = Depends(get_current_active_admin)
 ):
-    message = session.get(Message, message_id)
+    message = await session.get(Message, message_id)
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
-    session.delete(message)
-    session.commit()
+    await session.delete(message)
+    await session.commit()
     return None
\ No newline at end of file
@@ -0,0 +1,27 @@
+from typing import Any, Dict
+from fastapi import APIRouter, Depends
+
+from core.dependencies import get_current_active_admin
+from core.events import event_hub
+from core.principal_cache import principal_cache
+from core.response_cache import response_cache
+from core.security import password_hasher
+from db.group_commit import message_writer
+from db.replica import replica_sync
+from services.workflow.runner import workflow_workers
+
+router = APIRouter()
+
+@router.get("/", response_model=Dict[str, Any])
+def read_metrics(
+    _: None = Depends(get_current_active_admin),
+):
+    return {
+        "principal_cache": principal_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "response_cache": response_cache.stats(),
+        "replica": replica_sync.stats(),
+        "events": event_hub.stats(),
+        "message_writer": message_writer.stats(),
+        "workflow_runs": workflow_workers.stats(),
+    }
@@ -1,11 +1,14 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlmodel import Session, select
 
 from db.session import get_session
 from db.models import Permission
 from api.v1.schemas.permission import PermissionCreate, PermissionRead, PermissionUpdate
 from core.dependencies import get_current_active_admin
+from core.pagination import KeysetParams, keyset_page, keyset_query
+from core.permissions import permission_resolver
+from core.response_cache import response_cache, table_versions
 
 router = APIRouter()
 
@@ -22,15 +25,23 @@ def create_permission(
     session.add(perm)
     session.commit()
     session.refresh(perm)
+    permission_resolver.compile(session)
+    table_versions.bump("permission")
     return perm
 
 @router.get("/", response_model=List[PermissionRead])
 def read_permissions(
+    request: Request,
+    page: KeysetParams = Depends(),
     session: Session = Depends(get_session),
     _: None = Depends(get_current_active_admin)
 ):
-    result = session.exec(select(Permission)).all()
-    return result
+    def load(response: Response):
+        session.use_primary()
+        order = (Permission.id,)
+        result = session.exec(keyset_query(select(Permission), order, page)).all()
+        return keyset_page(result, order, page, response)
+    return response_cache.respond(request, ("permission",), List[PermissionRead], load)
 
 @router.get("/{permission_id}", response_model=PermissionRead)
 def read_permission(
@@ -59,6 +70,8 @@ def update_permission(
     session.add(perm)
     session.commit()
     session.refresh(perm)
+    permission_resolver.compile(session)
+    table_versions.bump("permission")
     return perm
 
 @router.delete("/{permission_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -72,4 +85,6 @@ def delete_permission(
         raise HTTPException(status_code=404, detail="Permission not found")
     session.delete(perm)
     session.commit()
+    permission_resolver.compile(session)
+    table_versions.bump("permission")
     return None
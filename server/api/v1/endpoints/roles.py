@@ -1,11 +1,16 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 
 from db.session import get_session
 from db.models import Role, Permission
 from api.v1.schemas.role import RoleCreate, RoleRead, RoleUpdate
 from core.dependencies import get_current_active_admin
+from core.pagination import KeysetParams, keyset_page, keyset_query
+from core.principal_cache import principal_cache
+from core.response_cache import response_cache, table_versions
+from core.permissions import permission_resolver
 
 router = APIRouter()
 
@@ -25,15 +30,25 @@ def create_role(
     session.add(role)
     session.commit()
     session.refresh(role)
+    permission_resolver.compile(session)
+    table_versions.bump("role")
     return role
 
 @router.get("/", response_model=List[RoleRead])
 def read_roles(
+    request: Request,
+    page: KeysetParams = Depends(),
     session: Session = Depends(get_session),
     _: None = Depends(get_current_active_admin)
 ):
-    roles = session.exec(select(Role)).all()
-    return roles
+    def load(response: Response):
+        session.use_primary()
+        order = (Role.id,)
+        query = select(Role).options(selectinload(Role.permissions))
+        roles = session.exec(keyset_query(query, order, page)).all()
+        return keyset_page(roles, order, page, response)
+    # Roles embed their permissions, so either table changes the payload.
+    return response_cache.respond(request, ("role", "permission"), List[RoleRead], load)
 
 @router.get("/{role_id}", response_model=RoleRead)
 def read_role(
@@ -67,6 +82,9 @@ def update_role(
     session.add(role)
     session.commit()
     session.refresh(role)
+    permission_resolver.compile(session)
+    principal_cache.invalidate_role(role_id)
+    table_versions.bump("role")
     return role
 
 @router.delete("/{role_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -80,4 +98,7 @@ def delete_role(
         raise HTTPException(status_code=404, detail="Role not found")
     session.delete(role)
     session.commit()
+    permission_resolver.compile(session)
+    principal_cache.invalidate_role(role_id)
+    table_versions.bump("role")
     return None
@@ -0,0 +1,78 @@
+import re
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from db.session import async_engine, get_async_session
+from db.models import User
+from api.v1.schemas.search import SearchHit
+from core.dependencies import get_current_active_user, is_admin
+from core.pagination import NEXT_CURSOR_HEADER, decode_offset_cursor, encode_cursor
+
+router = APIRouter()
+
+_SEARCH_SQL = """
+SELECT 'ticket' AS kind, t.id AS id, t.id AS ticket_id,
+       snippet(ticket_fts, -1, '[', ']', '...', 12) AS snippet,
+       bm25(ticket_fts) AS rank
+FROM ticket_fts JOIN ticket t ON t.id = ticket_fts.rowid
+WHERE ticket_fts MATCH :match {ticket_owner}
+UNION ALL
+SELECT 'message' AS kind, m.id AS id, m.ticket_id AS ticket_id,
+       snippet(message_fts, 0, '[', ']', '...', 12) AS snippet,
+       bm25(message_fts) AS rank
+FROM message_fts JOIN message m ON m.id = message_fts.rowid
+{message_join}
+WHERE message_fts MATCH :match {message_owner}
+ORDER BY rank, kind, id
+LIMIT :limit OFFSET :offset
+"""
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def to_match_expression(q: str) -> str:
+    """
+    Turn free text into a safe FTS5 query: every word must match, and the
+    last one as a prefix so results update while typing.
+    """
+    tokens = _TOKEN.findall(q)
+    if not tokens:
+        raise HTTPException(status_code=400, detail="Search query has no searchable terms")
+    quoted = [f'"{token}"' for token in tokens]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+@router.get("/", response_model=List[SearchHit])
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Ranked full-text search over ticket subjects/descriptions and message
+    bodies, limited to the caller's tickets unless they are an admin.
+    """
+    if async_engine.dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Full-text search requires the SQLite FTS5 backend")
+    offset = decode_offset_cursor(cursor) if cursor else 0
+    params = {"match": to_match_expression(q), "limit": limit + 1, "offset": offset}
+    if is_admin(current_user):
+        sql = _SEARCH_SQL.format(ticket_owner="", message_join="", message_owner="")
+    else:
+        sql = _SEARCH_SQL.format(
+            ticket_owner="AND t.user_id = :user_id",
+            message_join="JOIN ticket t ON t.id = m.ticket_id",
+            message_owner="AND t.user_id = :user_id",
+        )
+        params["user_id"] = current_user.id
+    rows = (await session.execute(text(sql), params)).mappings().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([offset + limit])
+    return [SearchHit(**row) for row in rows]
@@ -0,0 +1,33 @@
+import datetime
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from db.session import get_async_session
+from db.models import User
+from db import rollups
+from api.v1.schemas.stats import TicketStats
+from core.dependencies import require_permission
+
+router = APIRouter()
+
+@router.get("/tickets", response_model=TicketStats)
+async def read_ticket_stats(
+    hours: int = Query(24, ge=1, le=24 * 90),
+    session: AsyncSession = Depends(get_async_session),
+    _: User = Depends(require_permission("tickets:read"))
+):
+    """
+    Ticket counts per status and created/closed counts per hour over the
+    last `hours`, read from the rollup tables.
+    """
+    since = datetime.datetime.utcnow() - datetime.timedelta(hours=hours - 1)
+    by_status, hourly = await rollups.read_stats(session, since)
+    closed = by_status.get(rollups.CLOSED_STATUS, 0)
+    total = sum(by_status.values())
+    return TicketStats(
+        total=total,
+        open=total - closed,
+        closed=closed,
+        by_status={status: count for status, count in by_status.items() if count},
+        hourly=hourly,
+    )
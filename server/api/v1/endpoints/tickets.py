@@ -1,18 +1,25 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from db.session import get_session
+from db.session import get_async_session
 from db.models import Ticket, User
+from db import rollups
 from api.v1.schemas.ticket import TicketCreate, TicketRead, TicketUpdate
-from core.dependencies import get_current_active_user, get_current_active_admin
+from core.pagination import KeysetParams, keyset_page, keyset_query
+from core.projection import FieldSelection, projected_object, projected_response, projected_select
+from core.responses import trusted_dicts, trusted_response
+from core.events import event_hub, ticket_channels
+from core.dependencies import get_current_active_user, get_current_active_admin, is_admin, require_permission
 
 router = APIRouter()
 
 @router.post("/", response_model=TicketRead, status_code=status.HTTP_201_CREATED)
-def create_ticket(
+async def create_ticket(
     ticket_in: TicketCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
     ticket = Ticket(
@@ -22,60 +29,86 @@ def create_ticket(
         status=ticket_in.status
     )
     session.add(ticket)
-    session.commit()
-    session.refresh(ticket)
+    await session.flush()
+    await rollups.record_ticket_created(session, ticket)
+    await session.commit()
+    await session.refresh(ticket)
     return ticket
 
 @router.get("/", response_model=List[TicketRead])
-def read_tickets(
-    session: Session = Depends(get_session),
-    _: User = Depends(get_current_active_admin)
+async def read_tickets(
+    response: Response,
+    page: KeysetParams = Depends(),
+    fields: Optional[List[str]] = Depends(FieldSelection(TicketRead, Ticket)),
+    session: AsyncSession = Depends(get_async_session),
+    _: User = Depends(require_permission("tickets:read"))
 ):
-    tickets = session.exec(select(Ticket)).all()
-    return tickets
+    order = (Ticket.created_at, Ticket.id)
+    if fields:
+        rows = (await session.execute(keyset_query(projected_select(Ticket, fields, order), order, page))).all()
+        return projected_response(keyset_page(rows, order, page, response), fields, response)
+    tickets = (await session.exec(keyset_query(select(Ticket), order, page))).all()
+    return trusted_response(keyset_page(tickets, order, page, response), TicketRead, response)
 
 @router.get("/{ticket_id}", response_model=TicketRead)
-def read_ticket(
+async def read_ticket(
     ticket_id: int,
-    session: Session = Depends(get_session),
+    fields: Optional[List[str]] = Depends(FieldSelection(TicketRead, Ticket)),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    ticket = session.get(Ticket, ticket_id)
+    if fields:
+        # user_id is needed for the permission check even when not requested.
+        query = projected_select(Ticket, fields, (Ticket.user_id,)).where(Ticket.id == ticket_id)
+        ticket = (await session.execute(query)).first()
+    else:
+        ticket = await session.get(Ticket, ticket_id)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
-    if current_user.role.name.lower() != "admin" and ticket.user_id != current_user.id:
+    if not is_admin(current_user) and ticket.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    if fields:
+        return projected_object(ticket, fields)
     return ticket
 
 @router.put("/{ticket_id}", response_model=TicketRead)
-def update_ticket(
+async def update_ticket(
     ticket_id: int,
     ticket_update: TicketUpdate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    ticket = session.get(Ticket, ticket_id)
+    ticket = await session.get(Ticket, ticket_id)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
-    if current_user.role.name.lower() != "admin" and ticket.user_id != current_user.id:
+    if not is_admin(current_user) and ticket.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    old_status = ticket.status
     update_data = ticket_update.dict(exclude_unset=True)
     for key, val in update_data.items():
         setattr(ticket, key, val)
+    ticket.updated_at = datetime.datetime.utcnow()
     session.add(ticket)
-    session.commit()
-    session.refresh(ticket)
+    await rollups.record_status_change(session, ticket, old_status, ticket.updated_at)
+    await session.commit()
+    await session.refresh(ticket)
+    await event_hub.publish(
+        ticket_channels(ticket.id, ticket.user_id),
+        "ticket.updated",
+        trusted_dicts([ticket], TicketRead)[0],
+    )
     return ticket
 
 @router.delete("/{ticket_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_ticket(
+async def delete_ticket(
     ticket_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     _: User = Depends(get_current_active_admin)
 ):
-    ticket = session.get(Ticket, ticket_id)
+    ticket = await session.get(Ticket, ticket_id)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
-    session.delete(ticket)
-    session.commit()
+    await rollups.record_ticket_deleted(session, ticket)
+    await session.delete(ticket)
+    await session.commit()
     return None
\ No newline at end of file
@@ -1,19 +1,40 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import datetime
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import delete, insert, update
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from db.session import get_session
+from db.session import get_async_session, get_session
 from db.models import User
-from api.v1.schemas.user import UserCreate, UserRead, UserUpdate
-from core.dependencies import get_current_active_user, get_current_active_admin
-from core.security import get_password_hash
+from api.v1.schemas.user import (
+    UserBulkCreate,
+    UserBulkIds,
+    UserBulkResult,
+    UserBulkRoleChange,
+    UserCreate,
+    UserRead,
+    UserUpdate,
+)
+from core.dependencies import get_current_active_user, get_current_active_admin, is_admin
+from core.security import get_password_hash, password_hasher
+from core.config import settings
+from core.pagination import KeysetParams, keyset_page, keyset_query
+from core.projection import FieldSelection, projected_object, projected_response, projected_select
+from core.responses import trusted_response
+from core.principal_cache import principal_cache
+from core.revocation import revoke_user_tokens, token_revocations
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserRead)
-def read_current_user(
+async def read_current_user(
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
+    if settings.token_mode == "stateless":
+        # Claims only carry identity and authorization data.
+        return await session.get(User, current_user.id)
     return current_user
 
 @router.post("/", response_model=UserRead, status_code=status.HTTP_201_CREATED)
@@ -42,23 +63,36 @@ def create_user(
 
 @router.get("/", response_model=List[UserRead])
 def read_users(
+    response: Response,
+    page: KeysetParams = Depends(),
+    fields: Optional[List[str]] = Depends(FieldSelection(UserRead, User)),
     session: Session = Depends(get_session),
     _: User = Depends(get_current_active_admin)
 ):
-    users = session.exec(select(User)).all()
-    return users
+    order = (User.created_at, User.id)
+    if fields:
+        rows = session.exec(keyset_query(projected_select(User, fields, order), order, page)).all()
+        return projected_response(keyset_page(rows, order, page, response), fields, response)
+    users = session.exec(keyset_query(select(User), order, page)).all()
+    return trusted_response(keyset_page(users, order, page, response), UserRead, response)
 
 @router.get("/{user_id}", response_model=UserRead)
 def read_user(
     user_id: int,
+    fields: Optional[List[str]] = Depends(FieldSelection(UserRead, User)),
     session: Session = Depends(get_session),
     current_user: User = Depends(get_current_active_user)
 ):
-    user = session.get(User, user_id)
+    if fields:
+        user = session.execute(projected_select(User, fields).where(User.id == user_id)).first()
+    else:
+        user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    if current_user.role.name.lower() != "admin" and current_user.id != user_id:
+    if not is_admin(current_user) and current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    if fields:
+        return projected_object(user, fields)
     return user
 
 @router.put("/{user_id}", response_model=UserRead)
@@ -71,14 +105,21 @@ def update_user(
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    if current_user.role.name.lower() != "admin" and current_user.id != user_id:
+    if not is_admin(current_user) and current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     update_data = user_update.dict(exclude_unset=True)
+    revoke = any(
+        key in update_data and update_data[key] != getattr(user, key)
+        for key in ("status", "role_id")
+    )
     for key, value in update_data.items():
         setattr(user, key, value)
+    if revoke:
+        revoke_user_tokens(user)
     session.add(user)
     session.commit()
     session.refresh(user)
+    principal_cache.invalidate(user.email)
     return user
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -90,8 +131,10 @@ def delete_user(
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    revoke_user_tokens(user)
     session.delete(user)
     session.commit()
+    principal_cache.invalidate(user.email)
     return None
 
 @router.post("/{user_id}/reset-password", status_code=status.HTTP_200_OK)
@@ -104,6 +147,157 @@ def reset_password(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     user.password_hash = get_password_hash("password")
+    revoke_user_tokens(user)
     session.add(user)
     session.commit()
+    principal_cache.invalidate(user.email)
     return {"msg": "Password reset successfully"}
+
+# Bulk operations: one transaction and one statement per action, with a
+# result entry for every requested row.
+
+def _bulk_update(session: Session, user_ids: List[int], values: Dict[str, Any]) -> UserBulkResult:
+    """
+    Apply `values` to every listed user whose columns differ, revoking
+    their tokens, and report updated/unchanged/not_found per id.
+    """
+    rows = session.exec(
+        select(User.id, User.email, User.token_version, *(getattr(User, key) for key in values))
+        .where(User.id.in_(user_ids))
+    ).all()
+    found = {row[0]: row for row in rows}
+    changed = [
+        row for row in rows
+        if any(current != values[key] for key, current in zip(values, row[3:]))
+    ]
+    if changed:
+        session.exec(
+            update(User)
+            .where(User.id.in_([row[0] for row in changed]))
+            .values(
+                **values,
+                token_version=User.token_version + 1,
+                updated_at=datetime.datetime.utcnow(),
+            )
+        )
+    session.commit()
+
+    changed_ids = set()
+    for user_id, email, token_version, *_ in changed:
+        changed_ids.add(user_id)
+        token_revocations.revoke(user_id, token_version + 1)
+        principal_cache.invalidate(email)
+    results = []
+    for user_id in user_ids:
+        if user_id not in found:
+            results.append({"id": user_id, "result": "not_found"})
+        else:
+            results.append({
+                "id": user_id,
+                "email": found[user_id][1],
+                "result": "updated" if user_id in changed_ids else "unchanged",
+            })
+    return UserBulkResult(results=results)
+
+@router.post("/bulk/activate", response_model=UserBulkResult)
+def bulk_activate_users(
+    bulk_in: UserBulkIds,
+    session: Session = Depends(get_session),
+    _: User = Depends(get_current_active_admin)
+):
+    return _bulk_update(session, bulk_in.user_ids, {"status": "active"})
+
+@router.post("/bulk/deactivate", response_model=UserBulkResult)
+def bulk_deactivate_users(
+    bulk_in: UserBulkIds,
+    session: Session = Depends(get_session),
+    _: User = Depends(get_current_active_admin)
+):
+    return _bulk_update(session, bulk_in.user_ids, {"status": "inactive"})
+
+@router.post("/bulk/role", response_model=UserBulkResult)
+def bulk_change_role(
+    bulk_in: UserBulkRoleChange,
+    session: Session = Depends(get_session),
+    _: User = Depends(get_current_active_admin)
+):
+    return _bulk_update(session, bulk_in.user_ids, {"role_id": bulk_in.role_id})
+
+@router.post("/bulk/delete", response_model=UserBulkResult)
+def bulk_delete_users(
+    bulk_in: UserBulkIds,
+    session: Session = Depends(get_session),
+    _: User = Depends(get_current_active_admin)
+):
+    rows = session.exec(
+        select(User.id, User.email, User.token_version).where(User.id.in_(bulk_in.user_ids))
+    ).all()
+    found = {row[0]: row for row in rows}
+    if found:
+        session.exec(delete(User).where(User.id.in_(list(found))))
+    session.commit()
+
+    results = []
+    for user_id in bulk_in.user_ids:
+        if user_id not in found:
+            results.append({"id": user_id, "result": "not_found"})
+            continue
+        _, email, token_version = found[user_id]
+        token_revocations.revoke(user_id, token_version + 1)
+        principal_cache.invalidate(email)
+        results.append({"id": user_id, "email": email, "result": "deleted"})
+    return UserBulkResult(results=results)
+
+@router.post("/bulk/create", response_model=UserBulkResult, status_code=status.HTTP_201_CREATED)
+def bulk_create_users(
+    bulk_in: UserBulkCreate,
+    session: Session = Depends(get_session),
+    _: User = Depends(get_current_active_admin)
+):
+    emails = [u.email for u in bulk_in.users]
+    existing = set(session.exec(select(User.email).where(User.email.in_(emails))).all())
+    errors = {}
+    accepted = []
+    seen = set()
+    for index, user_in in enumerate(bulk_in.users):
+        if user_in.email in existing:
+            errors[index] = "Email already registered"
+        elif user_in.email in seen:
+            errors[index] = "Duplicate email in request"
+        else:
+            seen.add(user_in.email)
+            accepted.append(user_in)
+
+    hashes = password_hasher.hash_many([u.password for u in accepted])
+    now = datetime.datetime.utcnow()
+    rows = [
+        {
+            "email": user_in.email,
+            "full_name": user_in.full_name,
+            "position": user_in.position,
+            "department": user_in.department,
+            "phone": user_in.phone,
+            "status": "active",
+            "password_hash": password_hash,
+            "role_id": user_in.role_id,
+            "token_version": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for user_in, password_hash in zip(accepted, hashes)
+    ]
+    ids = {}
+    if rows:
+        session.exec(insert(User), params=rows)
+        ids = dict(session.exec(
+            select(User.email, User.id).where(User.email.in_([row["email"] for row in rows]))
+        ).all())
+    session.commit()
+
+    results = []
+    for index, user_in in enumerate(bulk_in.users):
+        if index in errors:
+            results.append({"email": user_in.email, "result": "error", "detail": errors[index]})
+        else:
+            results.append({"id": ids.get(user_in.email), "email": user_in.email, "result": "created"})
+    return UserBulkResult(results=results)
@@ -1,28 +1,58 @@
+import asyncio
+import datetime
+import json
 from typing import List, Any, Dict
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
 from sqlmodel import Session, select
 
 from db.session import get_session
-from db.models import WorkflowDefinition,User
+from db.models import WorkflowDefinition, WorkflowRun, User
 from api.v1.schemas.workflow import (
     WorkflowDefinitionCreate,
     WorkflowDefinitionRead,
     WorkflowDefinitionUpdate,
 )
-from core.dependencies import get_current_active_user, get_current_active_admin
-from crewai import Crew, Task
-from node_factory import NodeFactory
-from api.v1.schemas.workflow import WorkflowRunRequest
+from core.dependencies import get_current_active_user, get_current_active_admin, is_admin
+from api.v1.schemas.workflow import WorkflowRunMode, WorkflowRunRead, WorkflowRunRequest, WorkflowRunSubmit
+from services.workflow.expressions import check_conditions
+from services.workflow.plan import compile_plan, plan_cache
+from services.workflow.runner import FAILED, QUEUED, plan_for_graph, workflow_workers
 from services.workflow.workflow import WorkflowManager
 
 router = APIRouter()
 
+
+def _check_graph(graph_json: str) -> None:
+    """
+    Reject a graph whose decision conditions do not compile, so the
+    error shows up when the workflow is saved rather than when it runs.
+    """
+    try:
+        graph = json.loads(graph_json)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="graph_json is not valid JSON")
+    nodes = graph.get("nodes", []) if isinstance(graph, dict) else []
+    errors = check_conditions(nodes if isinstance(nodes, list) else [])
+    if errors:
+        raise HTTPException(status_code=422, detail={"message": "Invalid decision conditions", "errors": errors})
+
+
+def _run(manager: WorkflowManager, initial_inputs: Dict[str, Any], mode: WorkflowRunMode) -> Dict[str, Any]:
+    if mode == "sequential":
+        return manager.run(initial_inputs=initial_inputs)
+    if manager.plan.dag_error:
+        raise HTTPException(status_code=400, detail=f"Workflow cannot run in dag mode: {manager.plan.dag_error}")
+    # Sync endpoints run in a worker thread, which has no event loop of its own.
+    return asyncio.run(manager.run_dag(initial_inputs=initial_inputs))
+
+
 @router.post("/", response_model=WorkflowDefinitionRead, status_code=status.HTTP_201_CREATED)
 def create_workflow(
     wf_in: WorkflowDefinitionCreate,
     session: Session = Depends(get_session),
     _: None = Depends(get_current_active_admin),
 ):
+    _check_graph(wf_in.graph_json)
     wf = WorkflowDefinition(name=wf_in.name, graph_json=wf_in.graph_json)
     session.add(wf)
     session.commit()
@@ -59,8 +89,12 @@ def update_workflow(
     if not wf:
         raise HTTPException(status_code=404, detail="Workflow not found")
     data = wf_update.dict(exclude_unset=True)
+    if data.get("graph_json") is not None:
+        _check_graph(data["graph_json"])
     for key, val in data.items():
         setattr(wf, key, val)
+    # updated_at is part of the compiled plan cache key.
+    wf.updated_at = datetime.datetime.utcnow()
     session.add(wf)
     session.commit()
     session.refresh(wf)
@@ -79,61 +113,153 @@ def delete_workflow(
     session.commit()
     return None
 
-@router.post("/execute", response_model=dict[str, Any], status_code=status.HTTP_200_OK)
-def execute_workflow(
-    payload: dict[str, Any],
-    current_user: User = Depends(get_current_active_user),
+@router.post("/{workflow_id}/run", response_model=Dict[str, Any], status_code=status.HTTP_200_OK)
+def run_stored_workflow(
+    workflow_id: int,
+    initial_inputs: Dict[str, Any] = Body(default_factory=dict),
+    mode: WorkflowRunMode = Query("sequential"),
+    session: Session = Depends(get_session),
+    _: User = Depends(get_current_active_user),
 ):
     """
-    Execute a workflow definition provided in request body via CrewAI orchestration.
-    Expects JSON: { "graph_json": "<workflow graph JSON string>" }
+    Execute a stored workflow. Its compiled plan is cached per
+    (id, updated_at), so graph_json is only read and compiled again
+    after the workflow is edited.
     """
-    import json
-    graph_json = payload.get("graph_json")
-    if not graph_json:
-        raise HTTPException(status_code=400, detail="graph_json is required")
-    data = json.loads(graph_json)
-    # Parse nodes and flows
-    elements = data.get("nodes", [])
-    flows = data.get("flows", [])
-    # Separate nodes by type
-    start_elem = next((e for e in elements if e.get("type") == "start"), None)
-    end_elem = next((e for e in elements if e.get("type") == "end"), None)
-    if not start_elem or not end_elem:
-        raise HTTPException(status_code=400, detail="Workflow must include start and end nodes")
-    start_node = NodeFactory.from_json(start_elem)
-    end_node = NodeFactory.from_json(end_elem)
-    agent_elems = [e for e in elements if e.get("type") == "agent"]
-    task_elems = [e for e in elements if e.get("type") == "task"]
-    agent_nodes = [NodeFactory.from_json(e) for e in agent_elems]
-    task_nodes = [NodeFactory.from_json(e) for e in task_elems]
-    # Build and run workflow
-    from services.workflow.workflow import CrewWorkflow
-    workflow = CrewWorkflow(
-        start_node=start_node,
-        end_node=end_node,
-        agent_nodes=agent_nodes,
-        task_nodes=task_nodes
+    updated_at = session.exec(
+        select(WorkflowDefinition.updated_at).where(WorkflowDefinition.id == workflow_id)
+    ).first()
+    if updated_at is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+
+    def compile():
+        graph = json.loads(session.get(WorkflowDefinition, workflow_id).graph_json)
+        return compile_plan(graph.get("nodes", []), graph.get("edges", []))
+
+    try:
+        plan = plan_cache.get_or_compile((workflow_id, updated_at), compile)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid workflow graph: {exc}")
+    return _run(WorkflowManager.from_plan(plan), initial_inputs, mode)
+
+
+def _submit(
+    request: Request,
+    response: Response,
+    session: Session,
+    user: User,
+    graph_json: str,
+    initial_inputs: Dict[str, Any],
+    mode: WorkflowRunMode,
+    workflow_id: int | None = None,
+) -> WorkflowRun:
+    # Compile now so a broken graph is rejected here, not by the worker;
+    # the plan stays cached for when the run starts.
+    try:
+        plan = plan_for_graph(json.loads(graph_json))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid workflow graph: {exc}")
+    if mode == "dag" and plan.dag_error:
+        raise HTTPException(status_code=400, detail=f"Workflow cannot run in dag mode: {plan.dag_error}")
+    run = WorkflowRun(
+        workflow_id=workflow_id,
+        submitted_by=user.id,
+        mode=mode,
+        graph_json=graph_json,
+        inputs=initial_inputs,
     )
-    # Initialize inputs with user_id and additional payload data
-    inputs = {"user_id": current_user.id}
-    for k, v in payload.items():
-        if k != "graph_json":
-            inputs[k] = v
-    result = workflow.run(inputs, flows)
-    return {"result": result, "flows": flows}
-
-# Ad-hoc workflow execution without persistence
-@router.post("/run", response_model=Dict[str, Any], status_code=status.HTTP_200_OK)
-def run_workflow(
+    session.add(run)
+    session.commit()
+    session.refresh(run)
+    workflow_workers.submit(run.id)
+    response.headers["Location"] = str(request.url_for("read_workflow_run", run_id=run.id))
+    return run
+
+
+@router.post("/runs", response_model=WorkflowRunRead, status_code=status.HTTP_202_ACCEPTED)
+def submit_workflow_run(
     run_in: WorkflowRunRequest,
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Queue an ad-hoc workflow and return its run right away; poll
+    GET /runs/{run_id} for the result.
+    """
+    graph_json = json.dumps({
+        "nodes": [node.dict() for node in run_in.nodes],
+        "edges": [edge.dict() for edge in run_in.edges],
+    })
+    return _submit(request, response, session, current_user, graph_json, run_in.initial_inputs or {}, run_in.mode)
+
+
+@router.post("/{workflow_id}/runs", response_model=WorkflowRunRead, status_code=status.HTTP_202_ACCEPTED)
+def submit_stored_workflow_run(
+    workflow_id: int,
+    run_in: WorkflowRunSubmit,
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user),
 ):
     """
-    Execute an ad-hoc workflow from nodes/edges without persisting definition.
+    Queue a run of a stored workflow. The run keeps a snapshot of the
+    graph as it is now.
     """
-    wm = WorkflowManager(
-        nodes_data=[node.dict() for node in run_in.nodes],
-        edges_data=[edge.dict() for edge in run_in.edges],
+    wf = session.get(WorkflowDefinition, workflow_id)
+    if not wf:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return _submit(
+        request, response, session, current_user, wf.graph_json, run_in.initial_inputs, run_in.mode, workflow_id=wf.id
     )
-    result = wm.run(initial_inputs=run_in.initial_inputs)
-    return result
\ No newline at end of file
+
+
+def _get_run(session: Session, run_id: int, user: User) -> WorkflowRun:
+    run = session.exec(
+        select(WorkflowRun).where(WorkflowRun.id == run_id).execution_options(use_primary=True)
+    ).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Workflow run not found")
+    if not is_admin(user) and run.submitted_by != user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return run
+
+
+@router.get("/runs/{run_id}", response_model=WorkflowRunRead)
+def read_workflow_run(
+    run_id: int,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Status of a submitted run, with its result once it has completed.
+    """
+    return _get_run(session, run_id, current_user)
+
+
+@router.post("/runs/{run_id}/resume", response_model=WorkflowRunRead, status_code=status.HTTP_202_ACCEPTED)
+def resume_workflow_run(
+    run_id: int,
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Queue a failed run again. It continues from its last checkpoint:
+    nodes that already completed are replayed, not executed again.
+    """
+    run = _get_run(session, run_id, current_user)
+    if run.status != FAILED:
+        raise HTTPException(status_code=409, detail=f"Only failed runs can be resumed; run is {run.status}")
+    run.status = QUEUED
+    run.error = None
+    run.finished_at = None
+    session.add(run)
+    session.commit()
+    session.refresh(run)
+    workflow_workers.submit(run.id)
+    response.headers["Location"] = str(request.url_for("read_workflow_run", run_id=run.id))
+    return run
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from sqlmodel import SQLModel, Field
 
@@ -16,4 +16,14 @@ class MessageRead(MessageBase):
 
 class MessageUpdate(SQLModel):
     body: Optional[str] = None
-    sender_type: Optional[str] = None
\ No newline at end of file
+    sender_type: Optional[str] = None
+
+class MessageSyncRequest(SQLModel):
+    # ticket_id -> id of the last message the client already has (0 for none)
+    after_ids: Dict[int, int] = Field(min_length=1, max_length=200)
+    limit: int = Field(default=100, ge=1, le=500)
+
+class MessageSyncResult(SQLModel):
+    messages: Dict[int, List[MessageRead]]
+    # Tickets with more than `limit` new messages; sync them again.
+    has_more: List[int]
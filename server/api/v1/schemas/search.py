@@ -0,0 +1,9 @@
+from typing import Optional
+from sqlmodel import SQLModel
+
+class SearchHit(SQLModel):
+    kind: str  # "ticket" or "message"
+    id: int
+    ticket_id: int
+    snippet: Optional[str] = None
+    rank: float
@@ -0,0 +1,15 @@
+from typing import Dict, List
+from datetime import datetime
+from sqlmodel import SQLModel
+
+class TicketHourlyBucket(SQLModel):
+    bucket: datetime
+    created: int
+    closed: int
+
+class TicketStats(SQLModel):
+    total: int
+    open: int
+    closed: int
+    by_status: Dict[str, int]
+    hourly: List[TicketHourlyBucket]
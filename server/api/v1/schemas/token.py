@@ -4,6 +4,10 @@ from sqlmodel import SQLModel, Field
 class Token(SQLModel):
     access_token: str
     token_type: str = Field(default="bearer")
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(SQLModel):
+    refresh_token: str
 
 class TokenData(SQLModel):
     email: Optional[str] = None
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 import datetime
 from sqlmodel import SQLModel, Field
 
@@ -31,3 +31,21 @@ class UserUpdate(SQLModel):
     phone: Optional[str] = None
     status: Optional[str] = None
     role_id: Optional[int] = None
+
+class UserBulkIds(SQLModel):
+    user_ids: List[int] = Field(min_length=1, max_length=1000)
+
+class UserBulkRoleChange(UserBulkIds):
+    role_id: Optional[int] = None
+
+class UserBulkCreate(SQLModel):
+    users: List[UserCreate] = Field(min_length=1, max_length=1000)
+
+class UserBulkResultItem(SQLModel):
+    id: Optional[int] = None
+    email: Optional[str] = None
+    result: str  # "created", "updated", "unchanged", "deleted", "not_found" or "error"
+    detail: Optional[str] = None
+
+class UserBulkResult(SQLModel):
+    results: List[UserBulkResultItem]
@@ -19,9 +19,12 @@ class WorkflowDefinitionUpdate(SQLModel):
     graph_json: Optional[str] = None
 
 # Runtime schemas for executing workflows
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Literal, Optional
 from pydantic import BaseModel
 
+# "sequential" follows one path; "dag" runs independent branches concurrently.
+WorkflowRunMode = Literal["sequential", "dag"]
+
 class WorkflowNodeSchema(BaseModel):
     id: str
     type: str
@@ -35,4 +38,22 @@ class WorkflowEdgeSchema(BaseModel):
 class WorkflowRunRequest(BaseModel):
     nodes: List[WorkflowNodeSchema]
     edges: List[WorkflowEdgeSchema]
-    initial_inputs: Optional[Dict[str, Any]] = {}
\ No newline at end of file
+    initial_inputs: Optional[Dict[str, Any]] = {}
+    mode: WorkflowRunMode = "sequential"
+
+class WorkflowRunSubmit(BaseModel):
+    initial_inputs: Dict[str, Any] = {}
+    mode: WorkflowRunMode = "sequential"
+
+class WorkflowRunRead(BaseModel):
+    id: int
+    workflow_id: Optional[int] = None
+    submitted_by: int
+    status: str
+    mode: str
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
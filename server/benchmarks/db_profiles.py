@@ -0,0 +1,96 @@
+"""
+Concurrent read/write throughput of a SQLite file under each engine profile.
+
+    python -m benchmarks.db_profiles --readers 8 --writers 2 --seconds 5
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, select
+
+from core.config import DB_PROFILES, DatabaseProfile
+from db.models import Ticket, User
+from db.session import build_engine
+
+# Plain SQLAlchemy defaults (rollback journal, FULL sync), for comparison.
+PROFILES = {"baseline": DatabaseProfile(), **DB_PROFILES}
+
+
+def run_profile(name: str, profile: DatabaseProfile, readers: int, writers: int, seconds: float) -> dict:
+    profile = profile.model_copy(update={"sql_log_sample_rate": 0.0, "slow_query_ms": 0.0})
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", profile)
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add(User(email="bench@corp.com", password_hash="x", full_name="Bench", status="active"))
+            session.commit()
+            session.add_all(Ticket(user_id=1, subject=f"seed {i}") for i in range(1000))
+            session.commit()
+
+        stop = time.perf_counter() + seconds
+        counts = {"reads": 0, "writes": 0, "errors": 0}
+        lock = threading.Lock()
+
+        def reader():
+            done = errors = 0
+            with Session(engine) as session:
+                while time.perf_counter() < stop:
+                    try:
+                        session.exec(select(Ticket).where(Ticket.id == random.randint(1, 1000))).first()
+                        session.rollback()
+                        done += 1
+                    except OperationalError:
+                        session.rollback()
+                        errors += 1
+            with lock:
+                counts["reads"] += done
+                counts["errors"] += errors
+
+        def writer():
+            done = errors = 0
+            with Session(engine) as session:
+                while time.perf_counter() < stop:
+                    try:
+                        session.add(Ticket(user_id=1, subject="bench"))
+                        session.commit()
+                        done += 1
+                    except OperationalError:
+                        session.rollback()
+                        errors += 1
+            with lock:
+                counts["writes"] += done
+                counts["errors"] += errors
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads += [threading.Thread(target=writer) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    return {
+        "profile": name,
+        "reads/s": counts["reads"] / seconds,
+        "writes/s": counts["writes"] / seconds,
+        "errors": counts["errors"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--profiles", nargs="*", default=list(PROFILES))
+    args = parser.parse_args()
+
+    print(f"{'profile':<10}{'reads/s':>12}{'writes/s':>12}{'errors':>8}")
+    for name in args.profiles:
+        result = run_profile(name, PROFILES[name], args.readers, args.writers, args.seconds)
+        print(f"{result['profile']:<10}{result['reads/s']:>12.0f}{result['writes/s']:>12.0f}{result['errors']:>8}")
@@ -0,0 +1,89 @@
+"""
+Fan-out load test: 5k concurrent subscribers on the event hub.
+
+    python -m benchmarks.event_fanout --subscribers 5000 --events 200
+    python -m benchmarks.event_fanout --broker --workers 4
+
+Every subscriber follows the shared agent inbox, the worst case for
+fan-out. A few deliberately slow subscribers show that they are dropped
+instead of holding everyone else back. With --broker, subscribers are
+spread over several hubs joined through the local TCP broker, as if they
+were separate API workers.
+"""
+import argparse
+import asyncio
+import resource
+import statistics
+import time
+
+import orjson
+
+from core.event_broker import BrokerBackend, serve
+from core.events import EventHub, LocalBackend
+
+CHANNEL = "inbox:all"
+
+
+async def consume(subscription, latencies, slow: bool):
+    while (payload := await subscription.queue.get()) is not None:
+        latencies.append(time.perf_counter() - orjson.loads(payload)["data"]["sent"])
+        if slow:
+            await asyncio.sleep(0.05)
+
+
+async def run(args) -> None:
+    server = None
+    if args.broker:
+        server = await serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        hubs = [EventHub(BrokerBackend(f"tcp://127.0.0.1:{port}"), args.queue_size) for _ in range(args.workers)]
+    else:
+        hubs = [EventHub(LocalBackend(), args.queue_size)]
+    for hub in hubs:
+        await hub.start()
+
+    latencies = []
+    subscriptions = [hubs[i % len(hubs)].subscribe([CHANNEL]) for i in range(args.subscribers)]
+    consumers = [
+        asyncio.create_task(consume(sub, latencies, slow=i < args.slow))
+        for i, sub in enumerate(subscriptions)
+    ]
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    for i in range(args.events):
+        await hubs[0].publish([CHANNEL], "message.created", {"id": i, "body": "x" * 200, "sent": time.perf_counter()})
+        await asyncio.sleep(args.interval)
+    expected = (args.subscribers - args.slow) * args.events
+    while len(latencies) < expected and time.perf_counter() - started < 120:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - started
+
+    for hub in hubs:
+        await hub.stop()
+    await asyncio.gather(*consumers)
+    if server is not None:
+        await asyncio.sleep(0.1)  # let the broker see the workers hang up
+        server.close()
+
+    latencies.sort()
+    dropped = sum(hub.dropped for hub in hubs)
+    print(f"{args.subscribers} subscribers on {len(hubs)} hub(s), {args.events} events")
+    print(f"deliveries: {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:,.0f}/s)")
+    print(f"latency: p50 {statistics.median(latencies) * 1000:.1f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+    print(f"slow subscribers dropped: {dropped}/{args.slow}")
+    print(f"peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.005, help="seconds between published events")
+    parser.add_argument("--queue-size", type=int, default=32, help="smaller than the 256 default so slow subscribers overflow quickly")
+    parser.add_argument("--slow", type=int, default=10, help="subscribers that read 20 events/s")
+    parser.add_argument("--broker", action="store_true")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args))
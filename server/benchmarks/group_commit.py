@@ -0,0 +1,86 @@
+"""
+Message insert throughput and latency: one commit per message (the
+default create_message path) against the write-behind group commit.
+
+    python -m benchmarks.group_commit --messages 5000 --concurrency 64 --synchronous FULL
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.config import DB_PROFILES
+from db import migrations
+from db.group_commit import GroupCommitWriter
+from db.models import Message, Ticket, User
+from db.session import build_async_engine, build_engine
+
+
+async def per_message(engine, values):
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        message = Message(**values)
+        session.add(message)
+        await session.commit()
+        await session.refresh(message)
+
+
+async def drive(submit, messages: int, concurrency: int):
+    latencies = []
+    counter = iter(range(messages))
+
+    async def producer():
+        for i in counter:
+            started = time.perf_counter()
+            await submit({"ticket_id": 1, "sender_type": "agent", "body": f"streamed reply {i}"})
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(producer() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return messages / elapsed, latencies[int(len(latencies) * 0.99)] * 1000
+
+
+async def run(args) -> None:
+    profile = DB_PROFILES["prod"].model_copy(update={"slow_query_ms": 0.0})
+    profile.sqlite_pragmas = {**profile.sqlite_pragmas, "synchronous": args.synchronous}
+    print(f"{args.messages} messages, {args.concurrency} concurrent producers, synchronous={args.synchronous}")
+    print(f"{'path':<28}{'msgs/s':>10}{'p99 ms':>10}")
+    for name in ("commit per message", "group commit"):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'group_commit.db')}"
+            sync_engine = build_engine(url, profile)
+            migrations.upgrade(sync_engine)
+            with sync_engine.begin() as conn:
+                conn.execute(insert(User), [{"email": "bench@corp.com", "password_hash": "x", "full_name": "Bench"}])
+                conn.execute(insert(Ticket), [{"user_id": 1, "subject": "bench"}])
+            sync_engine.dispose()
+
+            engine = build_async_engine(url, profile)
+            if name == "group commit":
+                writer = GroupCommitWriter(engine, Message, args.max_rows, args.max_delay_ms, max_pending=100_000)
+                await writer.start()
+                submit = lambda values: writer.insert(Message(**values).model_dump(exclude={"id"}))
+                throughput, p99 = await drive(submit, args.messages, args.concurrency)
+                await writer.stop()
+                extra = f"  (avg batch {writer.stats()['avg_batch']:.0f})"
+            else:
+                throughput, p99 = await drive(lambda values: per_message(engine, values), args.messages, args.concurrency)
+                extra = ""
+            await engine.dispose()
+        print(f"{name:<28}{throughput:>10,.0f}{p99:>10.1f}{extra}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--synchronous", default="FULL", choices=["OFF", "NORMAL", "FULL"])
+    parser.add_argument("--max-rows", type=int, default=256)
+    parser.add_argument("--max-delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
@@ -0,0 +1,104 @@
+"""
+List-endpoint latency and memory with and without `?fields=` projection.
+
+    python -m benchmarks.projection --tickets 20000 --fields id,subject,status
+
+Each mode runs in a fresh interpreter against the same SQLite file, so the
+peak RSS growth it reports is not polluted by the other mode.
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BATCH = 10_000
+
+
+def build_corpus(database_url: str, tickets: int) -> None:
+    from sqlalchemy import insert
+
+    from core.config import DB_PROFILES
+    from db import migrations
+    from db.models import Ticket, User
+    from db.session import build_engine
+
+    engine = build_engine(database_url, DB_PROFILES["test"])
+    migrations.upgrade(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"email": "bench@corp.com", "password_hash": "x", "full_name": "Bench", "status": "active"}])
+        for start in range(0, tickets, BATCH):
+            conn.execute(insert(Ticket), [
+                {"user_id": 1, "subject": f"Ticket {i}", "description": "lorem ipsum dolor sit amet " * 8}
+                for i in range(start, min(start + BATCH, tickets))
+            ])
+    engine.dispose()
+
+
+def run_child(fields: str, limit: int, rounds: int) -> dict:
+    # Imported here: the app must see DATABASE_URL from the parent.
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as client:
+        token = client.post(
+            "/api/v1/auth/token", data={"username": "admin@corp.com", "password": "admin123!"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        params = {"limit": limit}
+        if fields:
+            params["fields"] = fields
+        client.get("/api/v1/tickets/", params=params, headers=headers)  # warm up
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        timings = []
+        for _ in range(rounds):
+            cursor = None
+            while True:
+                started = time.perf_counter()
+                r = client.get("/api/v1/tickets/", params={**params, "cursor": cursor} if cursor else params, headers=headers)
+                timings.append((time.perf_counter() - started) * 1000)
+                cursor = r.headers.get("x-next-cursor")
+                if not cursor:
+                    break
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "p50_ms": statistics.median(timings),
+        "mean_ms": statistics.fmean(timings),
+        "peak_rss_growth_mb": (rss_after - rss_before) / 1024,
+        "bytes_per_page": len(r.content),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=20_000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--fields", default="id,subject,status")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(run_child(args.child, args.limit, args.rounds)))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'projection.db')}", "DB_PROFILE": "test"}
+        build_corpus(env["DATABASE_URL"], args.tickets)
+        print(f"{args.tickets} tickets, pages of {args.limit}")
+        print(f"{'mode':<28}{'p50 ms':>10}{'mean ms':>10}{'bytes/page':>12}{'peak RSS +MB':>14}")
+        for label, fields in (("full TicketRead", ""), (f"fields={args.fields}", args.fields)):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.projection", "--child", fields,
+                 "--limit", str(args.limit), "--rounds", str(args.rounds)],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout.strip().splitlines()[-1]
+            result = json.loads(out)
+            print(f"{label:<28}{result['p50_ms']:>10.1f}{result['mean_ms']:>10.1f}"
+                  f"{result['bytes_per_page']:>12}{result['peak_rss_growth_mb']:>14.1f}")
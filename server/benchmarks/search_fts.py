@@ -0,0 +1,88 @@
+"""
+Ranked full-text search latency over a synthetic ticket/message corpus.
+
+    python -m benchmarks.search_fts --messages 1000000 --queries 200
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import insert, text
+
+from api.v1.endpoints.search import _SEARCH_SQL, to_match_expression
+from core.config import DB_PROFILES
+from db import migrations
+from db.models import Message, Ticket, User
+from db.session import build_engine
+
+WORDS = (
+    "printer vpn password reset laptop screen email outlook network wifi badge "
+    "access server backup license install update crash slow error login account "
+    "phone headset monitor keyboard mouse docking invoice payroll calendar meeting"
+).split()
+BATCH = 10_000
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def build_corpus(engine, messages: int, tickets: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    migrations.upgrade(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"email": "bench@corp.com", "password_hash": "x", "full_name": "Bench", "status": "active"}])
+        for start in range(0, tickets, BATCH):
+            conn.execute(insert(Ticket), [
+                {"user_id": 1, "subject": _sentence(rng, 4), "description": _sentence(rng, 20)}
+                for _ in range(start, min(start + BATCH, tickets))
+            ])
+        for start in range(0, messages, BATCH):
+            conn.execute(insert(Message), [
+                {"ticket_id": rng.randint(1, tickets), "sender_type": "agent", "body": _sentence(rng, 15)}
+                for _ in range(start, min(start + BATCH, messages))
+            ])
+
+
+def run(messages: int, queries: int, limit: int) -> dict:
+    profile = DB_PROFILES["prod"].model_copy(update={"sql_log_sample_rate": 0.0, "slow_query_ms": 0.0})
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(f"sqlite:///{os.path.join(tmp, 'search.db')}", profile)
+        started = time.perf_counter()
+        build_corpus(engine, messages, max(1, messages // 10))
+        load_seconds = time.perf_counter() - started
+
+        rng = random.Random(1)
+        sql = text(_SEARCH_SQL.format(ticket_owner="", message_join="", message_owner=""))
+        timings = []
+        with engine.connect() as conn:
+            for _ in range(queries):
+                q = " ".join(rng.sample(WORDS, 2))
+                q = q[:-rng.randint(0, 3)] or q
+                params = {"match": to_match_expression(q), "limit": limit + 1, "offset": 0}
+                started = time.perf_counter()
+                conn.execute(sql, params).all()
+                timings.append((time.perf_counter() - started) * 1000)
+        engine.dispose()
+
+    timings.sort()
+    return {
+        "load_s": load_seconds,
+        "p50_ms": statistics.median(timings),
+        "p95_ms": timings[int(len(timings) * 0.95) - 1],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    result = run(args.messages, args.queries, args.limit)
+    print(f"corpus: {args.messages} messages, loaded and indexed in {result['load_s']:.1f}s")
+    print(f"ranked search (limit {args.limit}): p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms")
@@ -0,0 +1,87 @@
+"""
+Cost of turning 10k `read_tickets` rows into a response body.
+
+    python -m benchmarks.serialization --rows 10000 --repeat 10
+
+Compares FastAPI's response_model path rendered by the stdlib JSON
+encoder (the previous default), the same path rendered by orjson, and the
+trusted path that skips response-model validation.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from api.v1.schemas.ticket import TicketRead
+from core.config import DB_PROFILES
+from core.responses import trusted_response
+from db import migrations
+from db.models import Ticket, User
+from db.session import build_engine
+
+
+def load_tickets(rows: int, tmp: str) -> List[Ticket]:
+    engine = build_engine(f"sqlite:///{os.path.join(tmp, 'serialization.db')}", DB_PROFILES["test"])
+    migrations.upgrade(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"email": "bench@corp.com", "password_hash": "x", "full_name": "Bench", "status": "active"}])
+        conn.execute(insert(Ticket), [
+            {"user_id": 1, "subject": f"Ticket {i}", "description": "lorem ipsum dolor sit amet " * 4}
+            for i in range(rows)
+        ])
+    with Session(engine, expire_on_commit=False) as session:
+        tickets = session.exec(select(Ticket).order_by(Ticket.created_at, Ticket.id)).all()
+        session.expunge_all()
+    engine.dispose()
+    return tickets
+
+
+def time_ms(fn, repeat: int) -> float:
+    fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tickets = load_tickets(args.rows, tmp)
+    field = create_model_field(name="Response_read_tickets", type_=List[TicketRead], mode="serialization")
+
+    loop = asyncio.new_event_loop()
+
+    def validated(response_class):
+        content = loop.run_until_complete(serialize_response(field=field, response_content=tickets))
+        return response_class(content).body
+
+    paths = {
+        "response_model + json": lambda: validated(JSONResponse),
+        "response_model + orjson": lambda: validated(ORJSONResponse),
+        "trusted + orjson": lambda: trusted_response(tickets, TicketRead).body,
+    }
+    bodies = [json.loads(fn()) for fn in paths.values()]
+    assert all(body == bodies[0] for body in bodies), "paths disagree on the payload"
+    print(f"{args.rows} tickets, median of {args.repeat}")
+    baseline = None
+    for name, fn in paths.items():
+        ms = time_ms(fn, args.repeat)
+        baseline = baseline or ms
+        print(f"{name:<26}{ms:>9.1f} ms{baseline / ms:>7.1f}x")
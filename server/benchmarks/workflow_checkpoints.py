@@ -0,0 +1,107 @@
+"""
+Per-node cost of workflow checkpointing.
+
+    python -m benchmarks.workflow_checkpoints --nodes 500 --context-kb 1024
+
+Runs a chain of cheap nodes (so any overhead shows) over a context that
+holds a large input document, three ways:
+
+    off        no checkpoints
+    diff       RunCheckpoints: per-node diff, batched through GroupCommitWriter
+    full-copy  what a naive checkpoint costs: serializing the whole context
+               after every node (encoding only, no database write)
+
+against a throwaway SQLite database. The wait for the last checkpoint
+batch to commit happens once per run and is reported separately.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import orjson
+
+
+def build_graph(nodes: int) -> Tuple[List[Dict], List[Dict]]:
+    graph: List[Dict] = [{"id": "input", "type": "inputNode", "data": {}}]
+    edges: List[Dict] = []
+    previous = "input"
+    for i in range(nodes):
+        graph.append({"id": f"room-{i}", "type": "roomCreation", "room_name": f"room-{i}-{{name}}"})
+        edges.append({"source": previous, "target": f"room-{i}"})
+        previous = f"room-{i}"
+    graph.append({"id": "output", "type": "outputNode", "outputs": [{"name": "last", "value": f"{{output_{previous}[room_name]}}"}]})
+    edges.append({"source": previous, "target": "output"})
+    return graph, edges
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=500)
+    parser.add_argument("--context-kb", type=int, default=1024, help="Size of the document in the initial context.")
+    parser.add_argument("--batch-delay-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "checkpoints.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    import logging
+    logging.disable(logging.INFO)
+
+    from sqlalchemy import insert
+
+    from db import migrations
+    from db.group_commit import GroupCommitWriter
+    from db.models import User, WorkflowCheckpoint, WorkflowRun
+    from db.session import async_engine, engine
+    from services.workflow.checkpoints import RunCheckpoints
+    from services.workflow.plan import compile_plan
+    from services.workflow.workflow import WorkflowManager
+
+    migrations.upgrade(engine)
+    nodes, edges = build_graph(args.nodes)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"email": "bench@corp.com", "password_hash": "x", "full_name": "Bench"}])
+        conn.execute(insert(WorkflowRun), [{"submitted_by": 1, "graph_json": "{}", "inputs": {}}])
+
+    manager = WorkflowManager.from_plan(compile_plan(nodes, edges))
+    inputs = {"name": "bench", "document": "x" * (args.context_kb * 1024)}
+    loop = asyncio.get_running_loop()
+    writer = GroupCommitWriter(async_engine, WorkflowCheckpoint, max_rows=256, max_delay_ms=args.batch_delay_ms, max_pending=10000)
+    await writer.start()
+
+    class FullCopy:
+        def replay(self, node_id):
+            return None
+
+        def record(self, node_id, handle, before, after):
+            orjson.dumps(after, default=str)
+
+    async def timed(checkpoints) -> Tuple[float, float]:
+        started = time.perf_counter()
+        result = await loop.run_in_executor(None, manager.run, inputs, checkpoints)
+        ran = time.perf_counter()
+        if isinstance(checkpoints, RunCheckpoints):
+            await checkpoints.flush()
+        assert result["status"] == "completed", result
+        return ran - started, time.perf_counter() - ran
+
+    await timed(None)
+    off, _ = await timed(None)
+    checkpoints = RunCheckpoints(1, writer, [], 1)
+    diff, diff_flush = await timed(checkpoints)
+    full, _ = await timed(FullCopy())
+    await writer.stop()
+
+    steps = args.nodes + 1
+    print(f"{steps} checkpointed nodes, context document {args.context_kb} KiB")
+    for label, total in (("off", off), ("diff", diff), ("full-copy", full)):
+        print(f"{label:<10} run {total * 1000:8.1f} ms   {(total - off) / steps * 1e6:8.1f} us/node overhead")
+    print(f"diff: waiting for the last batch to commit took {diff_flush * 1000:.1f} ms once at the end of the run")
+    print(f"checkpoint writer: {writer.stats()}")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
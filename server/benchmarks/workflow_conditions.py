@@ -0,0 +1,51 @@
+"""
+Cost of evaluating a DecisionPointNode condition: the old per-call
+`eval()` of the raw string against the precompiled condition function.
+
+    python -m benchmarks.workflow_conditions --calls 100000
+"""
+import argparse
+import json
+import time
+
+from services.workflow.expressions import compile_condition
+
+CONDITIONS = [
+    "context['output_action-verify']['decision'] == 'accept'",
+    "context.get('priority', 'low') in ('high', 'urgent') and not context.get('escalated')",
+    "context['score'] >= 0.8 or context['output_action-verify'].get('reason') is None",
+]
+
+CONTEXT = {
+    "output_action-verify": {"decision": "accept", "reason": "In scope"},
+    "priority": "high",
+    "escalated": False,
+    "score": 0.5,
+}
+
+
+def per_call_us(fn, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'condition':<60} {'eval':>9} {'compiled':>9} {'compile':>9}   (us)")
+    for source in CONDITIONS:
+        condition = compile_condition(source)
+        assert condition(CONTEXT) == eval(source, {"json": json}, {"context": CONTEXT})
+        raw = per_call_us(lambda: eval(source, {"json": json}, {"context": CONTEXT}), args.calls)
+        compiled = per_call_us(lambda: condition(CONTEXT), args.calls)
+        build = per_call_us(lambda: compile_condition(source), max(1, args.calls // 100))
+        label = source if len(source) <= 60 else source[:57] + "..."
+        print(f"{label:<60} {raw:9.3f} {compiled:9.3f} {build:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
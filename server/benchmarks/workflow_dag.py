@@ -0,0 +1,97 @@
+"""
+End-to-end latency of a multi-check workflow, sequential vs DAG mode.
+
+    python -m benchmarks.workflow_dag --latencies 0.4,0.8,1.2,0.6 --runs 3
+
+Each check is an ActionBlock on its own agent. The agents use a CrewAI LLM
+that sleeps for the given latency and returns a fixed verdict instead of
+calling a provider, so the numbers isolate scheduling: sequential mode
+chains the checks (sum of latencies), DAG mode fans them out from the
+input node into a join (the longest latency).
+"""
+import argparse
+import asyncio
+import dataclasses
+import logging
+import statistics
+import time
+from types import MappingProxyType
+from typing import Dict, List, Tuple
+
+from crewai import Agent
+from crewai.llms.base_llm import BaseLLM
+
+from services.workflow.plan import compile_plan
+from services.workflow.workflow import WorkflowManager
+
+
+class FixedLatencyLLM(BaseLLM):
+    latency: float = 0.5
+
+    def call(self, messages, *args, **kwargs) -> str:
+        time.sleep(self.latency)
+        return 'Thought: I checked the ticket.\nFinal Answer: {"decision": "accept"}'
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+
+def build_graph(checks: int, parallel: bool) -> Tuple[List[Dict], List[Dict]]:
+    nodes: List[Dict] = [{"id": "input", "type": "inputNode", "data": {}}]
+    edges: List[Dict] = []
+    previous = "input"
+    for i in range(checks):
+        nodes.append({"id": f"agent-{i}", "type": "automationAgent", "role": f"Checker {i}", "goal": "Check the ticket.", "backstory": "You check tickets."})
+        nodes.append({"id": f"check-{i}", "type": "actionBlock", "agent_id": f"agent-{i}", "description": "Check '{issue}'", "expected_output": "A JSON verdict."})
+        edges.append({"source": "input" if parallel else previous, "target": f"check-{i}"})
+        if parallel:
+            edges.append({"source": f"check-{i}", "target": "join"})
+        previous = f"check-{i}"
+    nodes.append({"id": "join", "type": "joinNode", "data": {}})
+    if not parallel:
+        edges.append({"source": previous, "target": "join"})
+    nodes.append({"id": "output", "type": "outputNode", "outputs": [
+        {"name": f"check_{i}", "value": f"{{output_check-{i}[decision]}}"} for i in range(checks)
+    ]})
+    edges.append({"source": "join", "target": "output"})
+    return nodes, edges
+
+
+def manager(latencies: List[float], parallel: bool) -> WorkflowManager:
+    plan = compile_plan(*build_graph(len(latencies), parallel))
+    agents = {
+        f"agent-{i}": Agent(role=f"Checker {i}", goal="Check the ticket.", backstory="You check tickets.",
+                            llm=FixedLatencyLLM(model="fixed-latency", latency=latency))
+        for i, latency in enumerate(latencies)
+    }
+    return WorkflowManager.from_plan(dataclasses.replace(plan, agents=MappingProxyType(agents)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latencies", default="0.4,0.8,1.2,0.6", help="Simulated LLM seconds per check.")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    latencies = [float(x) for x in args.latencies.split(",")]
+    inputs = {"issue": "I cannot log in."}
+    sequential = manager(latencies, parallel=False)
+    dag = manager(latencies, parallel=True)
+    print(f"{len(latencies)} checks, simulated latency sum {sum(latencies):.2f} s, max {max(latencies):.2f} s")
+
+    for label, run in (
+        ("sequential", lambda: sequential.run(inputs)),
+        ("dag", lambda: asyncio.run(dag.run_dag(inputs))),
+    ):
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            result = run()
+            timings.append(time.perf_counter() - started)
+            assert result["status"] == "completed", result
+        print(f"{label:<11} median {statistics.median(timings):6.3f} s   min {min(timings):6.3f} s   output {result['output']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Per-run setup overhead of WorkflowManager with and without the compiled
+plan cache.
+
+    python -m benchmarks.workflow_plan --agents 3 --decisions 20 --runs 50
+
+"cold" compiles the graph on every run, which is what every ad-hoc
+run request used to pay: node validation, edge map and a new
+CrewAI Agent (plus tools) per automationAgent node. "cached" is the
+steady state, where a run only hashes the graph and gets the shared plan.
+No workflow is executed, so no LLM calls are made.
+"""
+import argparse
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+from services.workflow.plan import compile_plan, plan_cache
+from services.workflow.workflow import WorkflowManager
+
+
+def build_graph(agents: int, decisions: int) -> Tuple[List[Dict], List[Dict]]:
+    nodes: List[Dict] = [{"id": "input", "type": "inputNode", "data": {"label": "Ticket"}}]
+    edges: List[Dict] = []
+    previous = "input"
+    for i in range(agents):
+        nodes.append({
+            "id": f"agent-{i}", "type": "automationAgent",
+            "role": f"Reviewer {i}", "goal": "Review the ticket.", "backstory": "You review tickets.",
+        })
+        nodes.append({
+            "id": f"action-{i}", "type": "actionBlock", "agent_id": f"agent-{i}",
+            "description": "Review '{issue}'", "expected_output": "A JSON verdict.",
+        })
+        edges.append({"id": f"e-{previous}-action-{i}", "source": previous, "target": f"action-{i}"})
+        previous = f"action-{i}"
+    for i in range(decisions):
+        nodes.append({"id": f"decision-{i}", "type": "decisionPoint", "condition": f"context.get('k{i}') == {i}"})
+        edges.append({"id": f"e-{previous}-decision-{i}", "source": previous, "target": f"decision-{i}", "sourceHandle": "true"})
+        previous = f"decision-{i}"
+    nodes.append({"id": "output", "type": "outputNode", "outputs": [{"name": "status", "value": "done"}]})
+    edges.append({"id": f"e-{previous}-output", "source": previous, "target": "output", "sourceHandle": "true"})
+    return nodes, edges
+
+
+def measure(label: str, runs: int, setup) -> None:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        setup()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{label:<8} p50 {statistics.median(timings):9.3f} ms   p99 {p99:9.3f} ms   mean {statistics.fmean(timings):9.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--agents", type=int, default=3)
+    parser.add_argument("--decisions", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    nodes, edges = build_graph(args.agents, args.decisions)
+    print(f"{len(nodes)} nodes ({args.agents} agents), {len(edges)} edges, {args.runs} runs")
+
+    # Warm imports and lazy CrewAI/provider initialisation before timing.
+    compile_plan(nodes, edges)
+
+    measure("cold", args.runs, lambda: WorkflowManager.from_plan(compile_plan(nodes, edges)))
+    plan_cache.clear()
+    WorkflowManager(nodes, edges)
+    measure("cached", args.runs, lambda: WorkflowManager(nodes, edges))
+    print(f"plan cache: {plan_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
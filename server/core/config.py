@@ -1,15 +1,126 @@
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings
-from pydantic import ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+class DatabaseProfile(BaseModel):
+    """
+    Engine tuning for one deployment flavour. SQLite URLs use the pragmas,
+    server databases use the pool settings.
+    """
+    sqlite_pragmas: Dict[str, str | int] = Field(default_factory=dict)
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_pre_ping: bool = False
+    pool_recycle: int = -1
+    # Fraction of statements logged at INFO, and the threshold above which
+    # a statement is always logged at WARNING (0 disables either).
+    sql_log_sample_rate: float = 0.0
+    slow_query_ms: float = 0.0
+
+DB_PROFILES: Dict[str, DatabaseProfile] = {
+    "dev": DatabaseProfile(
+        sqlite_pragmas={
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -16000,
+            "mmap_size": 64 * 1024 * 1024,
+            "busy_timeout": 5000,
+        },
+        pool_size=5,
+        max_overflow=10,
+        sql_log_sample_rate=0.05,
+        slow_query_ms=200,
+    ),
+    "prod": DatabaseProfile(
+        sqlite_pragmas={
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size": -64000,
+            "mmap_size": 256 * 1024 * 1024,
+            "busy_timeout": 10000,
+        },
+        pool_size=20,
+        max_overflow=20,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        slow_query_ms=500,
+    ),
+    "test": DatabaseProfile(
+        sqlite_pragmas={
+            "journal_mode": "WAL",
+            "synchronous": "OFF",
+            "cache_size": -8000,
+            "busy_timeout": 2000,
+        },
+        pool_size=5,
+        max_overflow=5,
+    ),
+}
 
 class Settings(BaseSettings):
+    # Root log level, applied by the server entrypoint (main.py).
+    log_level: str = "INFO"
     database_url: str = "sqlite:///./service_desk.db"
+    db_profile: str = "dev"
+    # Optional overrides of the active profile's SQL logging.
+    sql_log_sample_rate: Optional[float] = None
+    slow_query_ms: Optional[float] = None
+    # Optional read replica: GET requests read from it until they write.
+    # A SQLite replica can be refreshed from the primary file every
+    # `replica_sync_interval_seconds` (0 leaves syncing to someone else).
+    replica_database_url: Optional[str] = None
+    replica_sync_interval_seconds: float = 0.0
     jwt_secret: str = Field(default="SERVICEDESK")
     jwt_algo: str = "HS256"
     access_token_expire_minutes: int = 30
+    refresh_token_expire_minutes: int = 60 * 24 * 7
+    # "stateful" looks the user up on every request; "stateless" embeds
+    # uid/role/status claims in the access token and skips the database.
+    token_mode: str = "stateful"
+    principal_cache_max_entries: int = 1024
+    principal_cache_ttl_seconds: float = 60.0
+    response_cache_max_bytes: int = 8 * 1024 * 1024
+    # Live ticket/message events: per-subscriber queue bound, and an
+    # optional tcp://host:port broker shared by several workers.
+    event_queue_size: int = 256
+    event_broker_url: Optional[str] = None
+    # Write-behind batching for POST /messages/?write_behind=true.
+    message_batch_max_rows: int = 256
+    message_batch_max_delay_ms: float = 5.0
+    message_batch_max_pending: int = 10000
+    # Compiled workflow plans kept in memory (services/workflow/plan.py).
+    workflow_plan_cache_size: int = 128
+    # Threads for CrewAI kickoffs in DAG-mode workflow runs.
+    workflow_max_threads: int = 8
+    # Concurrent background workflow runs; 0 disables the pool in this process.
+    workflow_workers: int = 2
+    # A running run whose worker has not renewed its lease for this long
+    # is assumed lost and queued again.
+    workflow_lease_seconds: float = 30.0
+    # Per-node checkpoints for background runs, written in batches.
+    workflow_checkpoints: bool = True
+    workflow_checkpoint_batch_max_delay_ms: float = 20.0
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 32
 
     model_config = ConfigDict(
         env_file=".env",
         extra="ignore"
     )
 
+    @property
+    def database_profile(self) -> DatabaseProfile:
+        if self.db_profile not in DB_PROFILES:
+            raise ValueError(f"Unknown db_profile '{self.db_profile}', expected one of {sorted(DB_PROFILES)}")
+        overrides = {
+            key: value
+            for key, value in (
+                ("sql_log_sample_rate", self.sql_log_sample_rate),
+                ("slow_query_ms", self.slow_query_ms),
+            )
+            if value is not None
+        }
+        return DB_PROFILES[self.db_profile].model_copy(update=overrides)
+
 settings = Settings()
@@ -1,30 +1,93 @@
 import datetime
-from typing import Generator
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlmodel import Session, select
+from sqlalchemy.orm import joinedload
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from core.config import settings
-from core.security import verify_password
-from db.session import get_session
+from core.security import password_hasher
+from core.principal_cache import Principal, principal_cache
+from core.permissions import permission_resolver
+from core.revocation import token_revocations
+from db.session import get_async_session
 from db.models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
-def authenticate_user(session: Session, email: str, password: str) -> User | bool:
-    user = session.exec(select(User).where(User.email == email)).first()
-    if not user or not verify_password(password, user.password_hash):
+async def authenticate_user(session: AsyncSession, email: str, password: str) -> User | bool:
+    user = (await session.exec(select(User).where(User.email == email))).first()
+    if not user:
         return False
+    verified, new_hash = await password_hasher.averify_and_update(password, user.password_hash)
+    if not verified:
+        return False
+    if new_hash:
+        # Upgrade hashes created with older bcrypt parameters on login.
+        user.password_hash = new_hash
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
     return user
 
-def create_access_token(sub: str, expires_delta: datetime.timedelta | None = None) -> str:
-    to_encode = {"sub": sub}
+def create_access_token(
+    sub: str,
+    expires_delta: datetime.timedelta | None = None,
+    claims: dict | None = None,
+) -> str:
+    to_encode = {"sub": sub, **(claims or {})}
     expire = datetime.datetime.utcnow() + (expires_delta or datetime.timedelta(minutes=settings.access_token_expire_minutes))
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algo)
 
-def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> User:
+def issue_access_token(user: User) -> str:
+    """
+    Create an access token for `user`. In stateless mode the token carries
+    everything get_current_active_user needs, so no lookup is required.
+    """
+    claims = None
+    if settings.token_mode == "stateless":
+        claims = {
+            "uid": user.id,
+            "role_id": user.role_id,
+            "status": user.status,
+            "ver": user.token_version,
+        }
+    return create_access_token(sub=user.email, claims=claims)
+
+def create_refresh_token(user: User) -> str:
+    return create_access_token(
+        sub=user.email,
+        expires_delta=datetime.timedelta(minutes=settings.refresh_token_expire_minutes),
+        claims={"typ": "refresh", "uid": user.id, "ver": user.token_version},
+    )
+
+def decode_refresh_token(token: str) -> dict:
+    """
+    Validate a refresh token and return its claims; raises JWTError.
+    """
+    payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algo])
+    if payload.get("typ") != "refresh" or payload.get("uid") is None:
+        raise JWTError("Not a refresh token")
+    if token_revocations.is_revoked(payload["uid"], payload.get("ver", 0)):
+        raise JWTError("Token revoked")
+    return payload
+
+def _principal_from_claims(payload: dict) -> Principal:
+    user = User(
+        id=payload["uid"],
+        email=payload["sub"],
+        status=payload.get("status", "pending"),
+        role_id=payload.get("role_id"),
+        token_version=payload.get("ver", 0),
+    )
+    return Principal(user=user, status=user.status, role_name=None)
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(get_async_session),
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -33,21 +96,61 @@ def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Dep
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algo])
         email: str = payload.get("sub")
-        if email is None:
+        if email is None or payload.get("typ", "access") != "access":
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = session.exec(select(User).where(User.email == email)).first()
+    if "uid" in payload:
+        if token_revocations.is_revoked(payload["uid"], payload.get("ver", 0)):
+            raise credentials_exception
+        return _principal_from_claims(payload)
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+    user = (await session.exec(
+        select(User)
+        .where(User.email == email)
+        .options(joinedload(User.role))
+        .execution_options(use_primary=True)
+    )).first()
     if user is None:
         raise credentials_exception
-    return user
+    # Detach the user (with its role loaded) so the cached copy is never
+    # expired or mutated by a later commit in this or another request.
+    if user.role is not None:
+        session.expunge(user.role)
+    session.expunge(user)
+    principal = Principal(
+        user=user,
+        status=user.status,
+        role_name=user.role.name if user.role else None,
+    )
+    principal_cache.put(email, principal)
+    return principal
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_user(principal: Principal = Depends(get_current_principal)) -> User:
+    return principal.user
+
+async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     if current_user.status != "active":
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def get_current_active_admin(current_user: User = Depends(get_current_active_user)) -> User:
-    if not current_user.role or current_user.role.name.lower() != "admin":
+def is_admin(user: User) -> bool:
+    return permission_resolver.is_admin(user.role_id)
+
+async def get_current_active_admin(current_user: User = Depends(get_current_active_user)) -> User:
+    if not is_admin(current_user):
         raise HTTPException(status_code=403, detail="Not enough permissions")
     return current_user
+
+def require_permission(name: str):
+    """
+    Build a dependency that admits the current user only if their role
+    grants the named permission, e.g. Depends(require_permission("tickets:read")).
+    """
+    async def dependency(current_user: User = Depends(get_current_active_user)) -> User:
+        if not permission_resolver.has_permission(current_user.role_id, name):
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        return current_user
+    return dependency
@@ -0,0 +1,120 @@
+"""
+Minimal TCP fan-out broker so several API workers can share one event
+stream without extra infrastructure; a local stand-in for e.g. Redis
+pub/sub behind the same EventBackend interface.
+
+    python -m core.event_broker --port 7070
+    EVENT_BROKER_URL=tcp://127.0.0.1:7070 uvicorn main:app --workers 4
+
+Every frame is one line, b"<channel> <json payload>\\n", and is sent to
+every connected worker, the publisher included.
+"""
+import argparse
+import asyncio
+import logging
+from typing import Optional, Set
+from urllib.parse import urlparse
+
+from core.events import Deliver
+
+logger = logging.getLogger("core.event_broker")
+
+MAX_FRAME_BYTES = 1024 * 1024
+# A worker that stops reading is disconnected once this much is queued.
+MAX_PENDING_BYTES = 16 * 1024 * 1024
+RECONNECT_SECONDS = 1.0
+
+
+async def serve(host: str, port: int) -> asyncio.AbstractServer:
+    workers: Set[asyncio.StreamWriter] = set()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        workers.add(writer)
+        try:
+            while frame := await reader.readline():
+                for worker in list(workers):
+                    if worker.transport.get_write_buffer_size() > MAX_PENDING_BYTES:
+                        logger.warning("Disconnecting slow worker %s", worker.get_extra_info("peername"))
+                        workers.discard(worker)
+                        worker.close()
+                    else:
+                        worker.write(frame)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            workers.discard(writer)
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port, limit=MAX_FRAME_BYTES)
+
+
+class BrokerBackend:
+    """
+    EventBackend talking to the broker above. Reconnects in the
+    background; events published while disconnected are lost, and
+    clients recover them through the message sync API.
+    """
+
+    def __init__(self, url: str):
+        parsed = urlparse(url)
+        if parsed.scheme != "tcp" or not parsed.hostname or not parsed.port:
+            raise ValueError(f"Expected tcp://host:port, got '{url}'")
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._connected = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.lost = 0
+
+    async def start(self, deliver: Deliver) -> None:
+        self._task = asyncio.create_task(self._run(deliver))
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            logger.warning("Event broker at %s:%s not reachable yet", self.host, self.port)
+
+    async def _run(self, deliver: Deliver) -> None:
+        while True:
+            try:
+                reader, self._writer = await asyncio.open_connection(self.host, self.port, limit=MAX_FRAME_BYTES)
+                self._connected.set()
+                while frame := await reader.readline():
+                    channel, _, payload = frame.rstrip(b"\n").partition(b" ")
+                    deliver(channel.decode(), payload)
+                logger.warning("Event broker closed the connection")
+            except (ConnectionError, OSError) as exc:
+                logger.warning("Event broker connection failed: %s", exc)
+            self._connected.clear()
+            self._writer = None
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    async def publish(self, channel: str, payload: bytes) -> None:
+        writer = self._writer
+        if writer is None:
+            self.lost += 1
+            return
+        writer.write(channel.encode() + b" " + payload + b"\n")
+        await writer.drain()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Event fan-out broker for multi-worker deployments.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7070)
+    args = parser.parse_args()
+
+    async def main():
+        server = await serve(args.host, args.port)
+        print(f"Event broker listening on {args.host}:{args.port}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Set
+
+import orjson
+
+from core.config import settings
+
+logger = logging.getLogger("core.events")
+
+Deliver = Callable[[str, bytes], None]
+
+
+class EventBackend(Protocol):
+    """
+    Transport between hubs. `publish` hands a payload to every hub that
+    shares the backend, which passes it to `deliver` on its event loop.
+    """
+
+    async def start(self, deliver: Deliver) -> None: ...
+
+    async def publish(self, channel: str, payload: bytes) -> None: ...
+
+    async def stop(self) -> None: ...
+
+
+class LocalBackend:
+    """
+    Deliver straight back into this process; enough for one worker.
+    """
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    async def publish(self, channel: str, payload: bytes) -> None:
+        if self._deliver is not None:
+            self._deliver(channel, payload)
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+
+class Subscription:
+    """
+    One connected client: a bounded queue of encoded events. A `None` in
+    the queue means the subscription is over, either because the client
+    left or because it fell `queue_size` events behind and was dropped.
+    """
+
+    def __init__(self, channels: Iterable[str], queue_size: int):
+        self.channels = tuple(channels)
+        self.queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(queue_size)
+        self.closed = False
+        self.dropped = False
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        # Make room for the end marker; pending events are discarded.
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class EventHub:
+    """
+    In-process pub/sub fan-out from channels to subscriber queues. A slow
+    subscriber is dropped rather than allowed to buffer without bound or
+    hold up everyone else; clients reconnect and catch up through
+    GET /messages/sync.
+    """
+
+    def __init__(self, backend: EventBackend, queue_size: int):
+        self.backend = backend
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    async def start(self) -> None:
+        await self.backend.start(self._deliver)
+
+    async def stop(self) -> None:
+        await self.backend.stop()
+        for subscription in {s for subs in self._subscribers.values() for s in subs}:
+            self.unsubscribe(subscription)
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        subscription = Subscription(channels, self.queue_size)
+        for channel in subscription.channels:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for channel in subscription.channels:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+        subscription.close()
+
+    async def publish(self, channels: Iterable[str], event: str, data: Any) -> None:
+        payload = orjson.dumps({"event": event, "data": data})
+        for channel in channels:
+            await self.backend.publish(channel, payload)
+        self.published += 1
+
+    def _deliver(self, channel: str, payload: bytes) -> None:
+        for subscription in list(self._subscribers.get(channel, ())):
+            try:
+                subscription.queue.put_nowait(payload)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                subscription.dropped = True
+                self.dropped += 1
+                self.unsubscribe(subscription)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "channels": len(self._subscribers),
+            "subscribers": len({s for subs in self._subscribers.values() for s in subs}),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped_subscribers": self.dropped,
+        }
+
+
+def ticket_channels(ticket_id: int, owner_id: int) -> List[str]:
+    """
+    Channels an event about a ticket goes to: the ticket itself, its
+    owner's inbox and the shared inbox agents watch.
+    """
+    return [f"ticket:{ticket_id}", f"inbox:{owner_id}", "inbox:all"]
+
+
+def build_backend(broker_url: Optional[str]) -> EventBackend:
+    if not broker_url:
+        return LocalBackend()
+    from core.event_broker import BrokerBackend
+    return BrokerBackend(broker_url)
+
+
+event_hub = EventHub(build_backend(settings.event_broker_url), queue_size=settings.event_queue_size)
@@ -0,0 +1,87 @@
+import base64
+import datetime
+import json
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class KeysetParams:
+    """
+    Query parameters shared by every list endpoint. The cursor is opaque
+    to clients; it is the sort key of the last row of the previous page.
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(100, ge=1, le=1000),
+        cursor: Optional[str] = Query(None),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime.datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def _decode_raw(cursor: str) -> Any:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    try:
+        raw = _decode_raw(cursor)
+        if not isinstance(raw, list) or len(raw) != len(columns):
+            raise ValueError("cursor arity mismatch")
+        values = []
+        for column, value in zip(columns, raw):
+            if column.type.python_type is datetime.datetime:
+                value = datetime.datetime.fromisoformat(value)
+            values.append(value)
+        return values
+    except (ValueError, TypeError, NotImplementedError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    """
+    Decode a cursor for result sets without a stable key (e.g. ranked
+    search), where the cursor is just the next offset.
+    """
+    try:
+        raw = _decode_raw(cursor)
+        if not (isinstance(raw, list) and len(raw) == 1 and isinstance(raw[0], int) and raw[0] >= 0):
+            raise ValueError("not an offset cursor")
+        return raw[0]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_query(query, columns: Sequence[Any], params: KeysetParams):
+    """
+    Restrict `query` to rows strictly after the cursor in `columns` order
+    and fetch one extra row to detect whether another page exists.
+    """
+    if params.cursor:
+        values = decode_cursor(params.cursor, columns)
+        query = query.where(tuple_(*columns) > tuple_(*values))
+    return query.order_by(*columns).limit(params.limit + 1)
+
+
+def keyset_page(rows: Sequence[Any], columns: Sequence[Any], params: KeysetParams, response: Response) -> List[Any]:
+    """
+    Trim the look-ahead row and, if there was one, advertise the next
+    cursor in the X-Next-Cursor response header.
+    """
+    rows = list(rows)
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(last, c.key) for c in columns])
+    return rows
@@ -0,0 +1,68 @@
+import threading
+from typing import Dict, FrozenSet, NamedTuple, Optional
+
+from sqlmodel import Session, select
+
+from db.models import Permission, Role, RolePermissionLink
+from db.session import engine
+
+
+class _CompiledPermissions(NamedTuple):
+    bits: Dict[str, int]
+    role_masks: Dict[int, int]
+    admin_roles: FrozenSet[int]
+
+
+class PermissionResolver:
+    """
+    Compiles every role's permissions into an integer bitset so that
+    authorization checks are a dict lookup and a bitwise AND.
+    Roles named "admin" are superusers and pass every check.
+    """
+
+    def __init__(self):
+        self._compiled: Optional[_CompiledPermissions] = None
+        self._lock = threading.Lock()
+
+    def compile(self, session: Session) -> None:
+        permissions = session.exec(select(Permission.id, Permission.name).order_by(Permission.id)).all()
+        bits = {}
+        bits_by_id = {}
+        for index, (perm_id, name) in enumerate(permissions):
+            bits[name] = bits_by_id[perm_id] = 1 << index
+
+        roles = session.exec(select(Role.id, Role.name)).all()
+        role_masks = {role_id: 0 for role_id, _ in roles}
+        links = session.exec(select(RolePermissionLink.role_id, RolePermissionLink.permission_id)).all()
+        for role_id, perm_id in links:
+            if role_id in role_masks and perm_id in bits_by_id:
+                role_masks[role_id] |= bits_by_id[perm_id]
+
+        admin_roles = frozenset(role_id for role_id, name in roles if name.lower() == "admin")
+        # Swap the whole snapshot at once so readers never see a half-built table.
+        self._compiled = _CompiledPermissions(bits, role_masks, admin_roles)
+
+    def _snapshot(self) -> _CompiledPermissions:
+        compiled = self._compiled
+        if compiled is None:
+            with self._lock:
+                if self._compiled is None:
+                    with Session(engine) as session:
+                        self.compile(session)
+                compiled = self._compiled
+        return compiled
+
+    def is_admin(self, role_id: Optional[int]) -> bool:
+        return role_id in self._snapshot().admin_roles
+
+    def has_permission(self, role_id: Optional[int], name: str) -> bool:
+        compiled = self._snapshot()
+        if role_id in compiled.admin_roles:
+            return True
+        bit = compiled.bits.get(name)
+        if bit is None:
+            return False
+        return bool(compiled.role_masks.get(role_id, 0) & bit)
+
+
+permission_resolver = PermissionResolver()
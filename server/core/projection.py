@@ -0,0 +1,63 @@
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Query, Response
+from sqlmodel import SQLModel, select
+
+from core.responses import json_response
+
+
+class FieldSelection:
+    """
+    Dependency parsing `?fields=a,b,c` into the list of requested column
+    names, or None when the client wants the full `schema`. Only fields
+    that are both on the response schema and real columns of `model` may
+    be requested.
+    """
+
+    def __init__(self, schema: type[SQLModel], model: type[SQLModel]):
+        columns = model.__table__.columns
+        self.allowed = [name for name in schema.model_fields if name in columns]
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(
+            None,
+            description="Comma-separated subset of fields to return; omit for the full object.",
+        ),
+    ) -> Optional[List[str]]:
+        if fields is None:
+            return None
+        requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [f for f in requested if f not in self.allowed]
+        if not requested or unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown) or '(none given)'}; allowed: {', '.join(self.allowed)}",
+            )
+        return requested
+
+
+def projected_select(model: type[SQLModel], fields: Sequence[str], extra: Sequence[Any] = ()):
+    """
+    SELECT only `fields` from `model`'s table, plus the `extra` columns the
+    endpoint itself needs: the sort key keyset pagination builds the next
+    cursor from, or the owner a permission check looks at.
+    """
+    columns = model.__table__.columns
+    names = list(dict.fromkeys([*fields, *(c.key for c in extra)]))
+    return select(*(columns[name] for name in names))
+
+
+def projected_response(rows: Sequence[Any], fields: Sequence[str], response: Response) -> Response:
+    """
+    Serialize result rows straight to JSON, keeping only `fields` and any
+    headers already set on `response` (e.g. X-Next-Cursor).
+    """
+    return json_response([{name: row._mapping[name] for name in fields} for row in rows], response)
+
+
+def projected_object(row: Any, fields: Sequence[str]) -> Response:
+    """
+    Single-row counterpart of `projected_response` for detail endpoints.
+    """
+    return json_response({name: row._mapping[name] for name in fields})
@@ -0,0 +1,142 @@
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from core.config import settings
+
+CACHE_CONTROL = "private, no-cache"
+
+
+class TableVersions:
+    """
+    Per-table change counters. Write handlers bump a table after they
+    commit, which changes the ETag of every response built from it.
+    """
+
+    def __init__(self):
+        # Counters restart at zero with the process, so ETags also carry
+        # a per-process nonce to stay unique across restarts.
+        self.epoch = secrets.token_hex(4)
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def bump(self, *tables: str) -> None:
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+
+class ResponseCache:
+    """
+    Size-capped LRU of serialized JSON bodies keyed by ETag. An ETag is
+    derived from the versions of the tables a response reads plus the
+    request URL, so it can be computed, and a 304 answered, before any
+    query runs.
+    """
+
+    def __init__(self, versions: TableVersions, max_bytes: int):
+        self.versions = versions
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, Dict[str, str]]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._adapters: Dict[Any, TypeAdapter] = {}
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def etag(self, request: Request, tables: Iterable[str]) -> str:
+        state = ".".join(f"{t}:{self.versions.get(t)}" for t in tables)
+        digest = hashlib.sha1(f"{state}|{request.url.path}?{request.url.query}".encode()).hexdigest()[:16]
+        return f'"{self.versions.epoch}-{digest}"'
+
+    def get(self, etag: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(etag)
+            self.hits += 1
+            return entry
+
+    def put(self, etag: str, body: bytes, headers: Dict[str, str]) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if etag in self._entries:
+                return
+            self._entries[etag] = (body, headers)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def serialize(self, schema: Any, content: Any) -> bytes:
+        adapter = self._adapters.get(schema)
+        if adapter is None:
+            adapter = self._adapters[schema] = TypeAdapter(schema)
+        return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+    def respond(
+        self,
+        request: Request,
+        tables: Iterable[str],
+        schema: Any,
+        load: Callable[[Response], Any],
+    ) -> Response:
+        """
+        Serve `schema`-shaped JSON for this request from the cache, or
+        call `load(response)` and cache what it returns. Headers that
+        `load` sets on `response` (e.g. X-Next-Cursor) are cached too.
+        """
+        etag = self.etag(request, tables)
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if _matches(request.headers.get("if-none-match"), etag):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        entry = self.get(etag)
+        if entry is None:
+            scratch = Response()
+            body = self.serialize(schema, load(scratch))
+            extra = {k: v for k, v in scratch.headers.items() if k != "content-length"}
+            self.put(etag, body, extra)
+        else:
+            body, extra = entry
+        return Response(content=body, media_type="application/json", headers={**extra, **headers})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+table_versions = TableVersions()
+response_cache = ResponseCache(table_versions, max_bytes=settings.response_cache_max_bytes)
@@ -0,0 +1,54 @@
+import threading
+import time
+from typing import Dict, Tuple
+
+from core.config import settings
+from db.models import User
+
+
+class TokenRevocationList:
+    """
+    In-process record of the lowest token version still valid per user.
+    Entries outlive every access token issued before them and are then
+    pruned, so the table stays proportional to recent revocations.
+    """
+
+    def __init__(self, retention_seconds: float):
+        self.retention_seconds = retention_seconds
+        self._min_versions: Dict[int, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, user_id: int, min_version: int) -> None:
+        expires_at = time.monotonic() + self.retention_seconds
+        with self._lock:
+            current = self._min_versions.get(user_id)
+            if current is None or current[0] < min_version:
+                self._min_versions[user_id] = (min_version, expires_at)
+            self._prune(time.monotonic())
+
+    def is_revoked(self, user_id: int, version: int) -> bool:
+        entry = self._min_versions.get(user_id)
+        return entry is not None and version < entry[0]
+
+    def _prune(self, now: float) -> None:
+        expired = [uid for uid, (_, expires_at) in self._min_versions.items() if expires_at <= now]
+        for uid in expired:
+            del self._min_versions[uid]
+
+    def __len__(self) -> int:
+        return len(self._min_versions)
+
+
+token_revocations = TokenRevocationList(
+    retention_seconds=settings.access_token_expire_minutes * 60,
+)
+
+
+def revoke_user_tokens(user: User) -> None:
+    """
+    Invalidate every token issued to `user` so far. Bumps the persisted
+    token version, which the caller commits, and records it in memory so
+    stateless access tokens are rejected on decode.
+    """
+    user.token_version = (user.token_version or 0) + 1
+    token_revocations.revoke(user.id, user.token_version)
@@ -1,9 +1,183 @@
+import argparse
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
 from passlib.context import CryptContext
+from passlib.hash import bcrypt
+
+from core.config import settings
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+)
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when every hashing slot is taken; callers should answer 503.
+    """
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _hash_many(passwords: List[str]) -> List[str]:
+    return [pwd_context.hash(password) for password in passwords]
+
+
+def _verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated process pool so CPU-bound hashing never
+    holds the GIL of the API workers. At most `max_pending` operations may
+    be queued or running; anything beyond that fails fast.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    def _release(self, _: Future = None) -> None:
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def _submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy()
+        with self._lock:
+            self._pending += 1
+        if self.workers <= 0:
+            # Inline mode for scripts and single-process tooling.
+            future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as exc:
+                future.set_exception(exc)
+            self._release()
+            return future
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def hash(self, password: str) -> str:
+        return self._submit(_hash, password).result()
+
+    def hash_many(self, passwords: List[str]) -> List[str]:
+        """
+        Hash a batch in parallel: one chunk per worker, one slot per chunk.
+        """
+        if not passwords:
+            return []
+        chunk_size = -(-len(passwords) // max(self.workers, 1))
+        futures = [
+            self._submit(_hash_many, passwords[i:i + chunk_size])
+            for i in range(0, len(passwords), chunk_size)
+        ]
+        return [hashed for future in futures for hashed in future.result()]
+
+    def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and, when the stored hash uses outdated
+        parameters, also return a replacement hash.
+        """
+        return self._submit(_verify_and_update, password, hashed_password).result()
+
+    async def ahash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(_hash, password))
+
+    async def averify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await asyncio.wrap_future(self._submit(_verify_and_update, password, hashed_password))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hasher.verify_and_update(plain_password, hashed_password)[0]
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
+
+
+def calibrate_bcrypt_rounds(target_ms: float, samples: int = 3) -> Tuple[int, Dict[int, float]]:
+    """
+    Return the highest bcrypt cost whose hash time on this host stays
+    within `target_ms` (never below the bcrypt minimum of 4), and the
+    mean hash time in ms of every cost tried.
+    """
+    best = 4
+    timings: Dict[int, float] = {}
+    for rounds in range(4, 32):
+        handler = bcrypt.using(rounds=rounds)
+        started = time.perf_counter()
+        for _ in range(samples):
+            handler.hash("calibration-password")
+        timings[rounds] = elapsed_ms = (time.perf_counter() - started) * 1000 / samples
+        if elapsed_ms > target_ms:
+            break
+        best = rounds
+    return best, timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Password hashing utilities.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    calibrate = subparsers.add_parser("calibrate", help="Pick a bcrypt cost for a target latency.")
+    calibrate.add_argument("--target-ms", type=float, default=250.0)
+    calibrate.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == "calibrate":
+        rounds, timings = calibrate_bcrypt_rounds(args.target_ms, args.samples)
+        for cost, elapsed_ms in timings.items():
+            print(f"rounds={cost:2d}  {elapsed_ms:8.1f} ms")
+        print(f"\nBCRYPT_ROUNDS={rounds}")
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel
+
+from core.config import settings
+from db.models import Message
+from db.session import async_engine
+
+logger = logging.getLogger("db.group_commit")
+
+
+class WriteBufferFull(Exception):
+    """
+    Raised when the write-behind queue is at capacity; callers should
+    back off and retry.
+    """
+
+
+_Pending = Tuple[Dict[str, Any], "asyncio.Future[Dict[str, Any]]"]
+
+
+class GroupCommitWriter:
+    """
+    Write-behind inserts for one table. Rows from concurrent requests are
+    queued and flushed every `max_delay_ms` or `max_rows` rows, whichever
+    comes first, as one multi-row INSERT ... RETURNING in a single
+    transaction; each caller is answered once its batch has committed.
+    """
+
+    def __init__(self, engine: AsyncEngine, model: type[SQLModel], max_rows: int, max_delay_ms: float, max_pending: int):
+        self.engine = engine
+        self.table = model.__table__
+        self.max_rows = max_rows
+        self.max_delay = max_delay_ms / 1000
+        self.max_pending = max_pending
+        self._queue: Optional["asyncio.Queue[Optional[_Pending]]"] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.rows = 0
+        self.failed_batches = 0
+        self.rejected = 0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue(self.max_pending)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Flush whatever is queued, then stop the background task.
+        """
+        task, self._task = self._task, None
+        if task is None:
+            return
+        await self._queue.put(None)
+        await task
+
+    async def insert(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue one row and wait until it is committed; returns the stored
+        row (including its generated id).
+        """
+        return await self.enqueue(values)
+
+    def enqueue(self, values: Dict[str, Any]) -> "asyncio.Future[Dict[str, Any]]":
+        """
+        Queue one row without waiting; the returned future resolves to the
+        stored row once its batch has committed. Call on the event loop.
+        """
+        if self._task is None:
+            raise RuntimeError("GroupCommitWriter is not running")
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((values, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise WriteBufferFull()
+        return future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch: List[_Pending] = [first]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_rows:
+                # Take what is already queued without waiting ...
+                while len(batch) < self.max_rows and not self._queue.empty():
+                    item = self._queue.get_nowait()
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                remaining = deadline - loop.time()
+                if stopping or len(batch) >= self.max_rows or remaining <= 0:
+                    break
+                # ... then wait for more until the batch window closes.
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[_Pending]) -> None:
+        statement = insert(self.table).returning(*self.table.columns, sort_by_parameter_order=True)
+        try:
+            async with self.engine.begin() as conn:
+                rows = (await conn.execute(statement, [values for values, _ in batch])).mappings().all()
+        except Exception as exc:
+            self.failed_batches += 1
+            logger.exception("Group commit of %d rows into %s failed", len(batch), self.table.name)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        self.batches += 1
+        self.rows += len(batch)
+        for (_, future), row in zip(batch, rows):
+            if not future.done():
+                future.set_result(dict(row))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch": self.rows / self.batches if self.batches else 0.0,
+            "failed_batches": self.failed_batches,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "rejected": self.rejected,
+        }
+
+
+# Opt-in write-behind path for create_message (POST /messages/?write_behind=true).
+message_writer = GroupCommitWriter(
+    async_engine,
+    Message,
+    max_rows=settings.message_batch_max_rows,
+    max_delay_ms=settings.message_batch_max_delay_ms,
+    max_pending=settings.message_batch_max_pending,
+)
@@ -0,0 +1,246 @@
+"""
+Versioned schema migrations.
+
+Each migration runs in its own transaction and records its version in the
+single-row `schema_version` table, so startup only needs one SELECT to
+know the schema is current. Migration 1 creates the full current schema on
+an empty database, so every later migration must be idempotent.
+
+    python -m db.migrations upgrade   # apply pending migrations
+    python -m db.migrations current   # print the recorded version
+    python -m db.migrations explain   # check hot queries use their indexes
+"""
+import argparse
+import sys
+from typing import Callable, Dict, List, NamedTuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlmodel import SQLModel
+
+import db.models  # noqa: F401  (registers every table on SQLModel.metadata)
+from db import rollups
+from db.models import WorkflowCheckpoint, WorkflowRun
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    def register(fn: Callable[[Connection], None]):
+        MIGRATIONS.append(Migration(version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return fn
+    return register
+
+
+def _add_column_if_missing(conn: Connection, table: str, column: str, ddl: str) -> None:
+    columns = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column not in columns:
+        conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN {column} {ddl}'))
+
+
+def _create_index(conn: Connection, name: str, table: str, columns: str) -> None:
+    conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" ({columns})'))
+
+
+@migration(1, "Baseline schema")
+def _baseline(conn: Connection) -> None:
+    SQLModel.metadata.create_all(conn)
+    # Legacy databases may hold duplicate permission names.
+    conn.execute(text("DROP INDEX IF EXISTS ix_permission_name"))
+
+
+@migration(2, "User token version")
+def _user_token_version(conn: Connection) -> None:
+    _add_column_if_missing(conn, "user", "token_version", "INTEGER NOT NULL DEFAULT 0")
+
+
+@migration(3, "Keyset pagination indexes")
+def _keyset_indexes(conn: Connection) -> None:
+    _create_index(conn, "ix_user_created_at_id", "user", "created_at, id")
+    _create_index(conn, "ix_ticket_created_at_id", "ticket", "created_at, id")
+    _create_index(conn, "ix_message_timestamp_id", "message", "timestamp, id")
+
+
+@migration(4, "Workload indexes for tickets and messages")
+def _workload_indexes(conn: Connection) -> None:
+    _create_index(conn, "ix_message_ticket_id_timestamp", "message", "ticket_id, timestamp")
+    _create_index(conn, "ix_ticket_user_id_status_created_at", "ticket", "user_id, status, created_at")
+    _create_index(conn, "ix_ticket_status_updated_at", "ticket", "status, updated_at")
+
+
+@migration(5, "Full-text search over tickets and messages")
+def _full_text_search(conn: Connection) -> None:
+    # FTS5 external-content tables kept in sync by triggers; SQLite only.
+    if conn.dialect.name != "sqlite":
+        return
+    statements = [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS ticket_fts USING fts5(
+            subject, description, content='ticket', content_rowid='id')""",
+        """CREATE TRIGGER IF NOT EXISTS ticket_fts_ai AFTER INSERT ON ticket BEGIN
+            INSERT INTO ticket_fts(rowid, subject, description)
+            VALUES (new.id, new.subject, new.description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS ticket_fts_ad AFTER DELETE ON ticket BEGIN
+            INSERT INTO ticket_fts(ticket_fts, rowid, subject, description)
+            VALUES ('delete', old.id, old.subject, old.description);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS ticket_fts_au AFTER UPDATE OF subject, description ON ticket BEGIN
+            INSERT INTO ticket_fts(ticket_fts, rowid, subject, description)
+            VALUES ('delete', old.id, old.subject, old.description);
+            INSERT INTO ticket_fts(rowid, subject, description)
+            VALUES (new.id, new.subject, new.description);
+        END""",
+        """CREATE VIRTUAL TABLE IF NOT EXISTS message_fts USING fts5(
+            body, content='message', content_rowid='id')""",
+        """CREATE TRIGGER IF NOT EXISTS message_fts_ai AFTER INSERT ON message BEGIN
+            INSERT INTO message_fts(rowid, body) VALUES (new.id, new.body);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS message_fts_ad AFTER DELETE ON message BEGIN
+            INSERT INTO message_fts(message_fts, rowid, body) VALUES ('delete', old.id, old.body);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS message_fts_au AFTER UPDATE OF body ON message BEGIN
+            INSERT INTO message_fts(message_fts, rowid, body) VALUES ('delete', old.id, old.body);
+            INSERT INTO message_fts(rowid, body) VALUES (new.id, new.body);
+        END""",
+        "INSERT INTO ticket_fts(ticket_fts) VALUES ('rebuild')",
+        "INSERT INTO message_fts(message_fts) VALUES ('rebuild')",
+    ]
+    for statement in statements:
+        conn.execute(text(statement))
+
+
+@migration(6, "Ticket KPI rollups")
+def _ticket_rollups(conn: Connection) -> None:
+    SQLModel.metadata.create_all(conn, tables=[rollups.status_table, rollups.hourly_table])
+    # Filled by migration 9, once ticket.closed_at exists.
+
+
+@migration(7, "Workflow run queue")
+def _workflow_runs(conn: Connection) -> None:
+    SQLModel.metadata.create_all(conn, tables=[WorkflowRun.__table__])
+
+
+@migration(8, "Workflow run checkpoints")
+def _workflow_checkpoints(conn: Connection) -> None:
+    SQLModel.metadata.create_all(conn, tables=[WorkflowCheckpoint.__table__])
+
+
+@migration(9, "Ticket close time")
+def _ticket_closed_at(conn: Connection) -> None:
+    _add_column_if_missing(conn, "ticket", "closed_at", "TIMESTAMP")
+    # Best guess for tickets closed before the column existed; the same
+    # one the rollups used until now.
+    conn.execute(
+        text("UPDATE ticket SET closed_at = updated_at WHERE status = :closed AND closed_at IS NULL"),
+        {"closed": rollups.CLOSED_STATUS},
+    )
+    rollups.rebuild(conn)
+
+
+@migration(10, "Workflow run leases")
+def _workflow_run_leases(conn: Connection) -> None:
+    _add_column_if_missing(conn, "workflowrun", "worker_id", "VARCHAR")
+    _add_column_if_missing(conn, "workflowrun", "heartbeat_at", "TIMESTAMP")
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def current_version(conn: Connection) -> int:
+    try:
+        version = conn.execute(text("SELECT version FROM schema_version")).scalar()
+    except (OperationalError, ProgrammingError):
+        conn.rollback()
+        return 0
+    return version or 0
+
+
+def is_current(engine: Engine) -> bool:
+    with engine.connect() as conn:
+        return current_version(conn) >= latest_version()
+
+
+def upgrade(engine: Engine) -> List[Migration]:
+    """
+    Apply every migration newer than the recorded version, in order.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+        if conn.execute(text("SELECT COUNT(*) FROM schema_version")).scalar() == 0:
+            conn.execute(text("INSERT INTO schema_version (version) VALUES (0)"))
+
+    applied = []
+    for step in MIGRATIONS:
+        with engine.begin() as conn:
+            if current_version(conn) >= step.version:
+                continue
+            step.upgrade(conn)
+            conn.execute(text("UPDATE schema_version SET version = :v"), {"v": step.version})
+        applied.append(step)
+    return applied
+
+
+# Hot access paths and the index each one must use.
+EXPECTED_PLANS: Dict[str, tuple] = {
+    "messages of a ticket in order": (
+        "SELECT * FROM message WHERE ticket_id = 1 ORDER BY timestamp",
+        "ix_message_ticket_id_timestamp",
+    ),
+    "new messages of a ticket since the last seen id": (
+        "SELECT * FROM message WHERE ticket_id = 1 AND id > 100 ORDER BY id LIMIT 100",
+        "ix_message_ticket_id (ticket_id=? AND rowid>?)",
+    ),
+    "a user's tickets by status": (
+        "SELECT * FROM ticket WHERE user_id = 1 AND status = 'open' ORDER BY created_at",
+        "ix_ticket_user_id_status_created_at",
+    ),
+    "recently updated tickets by status": (
+        "SELECT * FROM ticket WHERE status = 'open' ORDER BY updated_at DESC",
+        "ix_ticket_status_updated_at",
+    ),
+}
+
+
+def explain_hot_queries(conn: Connection) -> Dict[str, tuple]:
+    """
+    Run EXPLAIN QUERY PLAN (SQLite) for each hot query and report whether
+    the expected index is used: {name: (ok, plan)}.
+    """
+    results = {}
+    for name, (sql, index) in EXPECTED_PLANS.items():
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+        plan = " | ".join(str(row[-1]) for row in rows)
+        results[name] = (index in plan, plan)
+    return results
+
+
+if __name__ == "__main__":
+    from db.session import engine
+
+    parser = argparse.ArgumentParser(description="Schema migrations.")
+    parser.add_argument("command", choices=["upgrade", "current", "explain"])
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        for step in upgrade(engine):
+            print(f"Applied {step.version}: {step.description}")
+        print(f"Schema at version {latest_version()}")
+    elif args.command == "current":
+        with engine.connect() as conn:
+            print(f"{current_version(conn)} (latest {latest_version()})")
+    elif args.command == "explain":
+        with engine.connect() as conn:
+            results = explain_hot_queries(conn)
+        for name, (ok, plan) in results.items():
+            print(f"[{'ok' if ok else 'FAIL'}] {name}: {plan}")
+        sys.exit(0 if all(ok for ok, _ in results.values()) else 1)
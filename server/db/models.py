@@ -1,7 +1,7 @@
 from typing import List, Optional
 import datetime
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, Index, JSON
 
 
 class RolePermissionLink(SQLModel, table=True):
@@ -36,7 +36,10 @@ class Role(SQLModel, table=True):
 
 
 class User(SQLModel, table=True):
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_user_created_at_id", "created_at", "id"),
+        {"extend_existing": True},
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     email: str = Field(unique=True, index=True)
     password_hash: str
@@ -46,6 +49,7 @@ class User(SQLModel, table=True):
     phone: Optional[str] = None
     status: str = Field(default="pending")
     role_id: Optional[int] = Field(default=None, foreign_key="role.id")
+    token_version: int = Field(default=0)
     last_login: Optional[datetime.datetime] = None
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
     updated_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
@@ -54,6 +58,11 @@ class User(SQLModel, table=True):
 
 # Ticket, Message, Workflow and IntegrationConfig models
 class Ticket(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_ticket_created_at_id", "created_at", "id"),
+        Index("ix_ticket_user_id_status_created_at", "user_id", "status", "created_at"),
+        Index("ix_ticket_status_updated_at", "status", "updated_at"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id", index=True)
     subject: str
@@ -61,11 +70,17 @@ class Ticket(SQLModel, table=True):
     status: str = Field(default="open")
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
     updated_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+    # When the ticket was last closed; maintained by db.rollups.
+    closed_at: Optional[datetime.datetime] = None
 
     messages: List["Message"] = Relationship(back_populates="ticket")
 
 
 class Message(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_message_timestamp_id", "timestamp", "id"),
+        Index("ix_message_ticket_id_timestamp", "ticket_id", "timestamp"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     ticket_id: int = Field(foreign_key="ticket.id", index=True)
     sender_type: str  # "user" or "agent"
@@ -75,6 +90,18 @@ class Message(SQLModel, table=True):
     ticket: Ticket = Relationship(back_populates="messages")
 
 
+# Ticket KPI rollups, maintained by db.rollups
+class TicketStatusCount(SQLModel, table=True):
+    status: str = Field(primary_key=True)
+    count: int = Field(default=0)
+
+
+class TicketHourlyStats(SQLModel, table=True):
+    bucket: datetime.datetime = Field(primary_key=True)
+    created: int = Field(default=0)
+    closed: int = Field(default=0)
+
+
 class WorkflowDefinition(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(index=True, unique=True)
@@ -83,6 +110,46 @@ class WorkflowDefinition(SQLModel, table=True):
     updated_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
 
 
+class WorkflowRun(SQLModel, table=True):
+    """
+    A submitted workflow execution. The graph is snapshotted at submit
+    time, so a queued run is unaffected by later edits and can be resumed
+    from the table alone after a restart.
+    """
+    __table_args__ = (
+        Index("ix_workflowrun_status_id", "status", "id"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    workflow_id: Optional[int] = Field(default=None, foreign_key="workflowdefinition.id", index=True)
+    submitted_by: int = Field(foreign_key="user.id", index=True)
+    status: str = Field(default="queued")
+    mode: str = Field(default="sequential")
+    graph_json: str
+    inputs: dict = Field(sa_column=Column(JSON), default_factory=dict)
+    result: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = None
+    attempts: int = Field(default=0)
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+    started_at: Optional[datetime.datetime] = None
+    finished_at: Optional[datetime.datetime] = None
+    # Lease of the worker executing a running run, renewed while it runs.
+    worker_id: Optional[str] = None
+    heartbeat_at: Optional[datetime.datetime] = None
+
+
+class WorkflowCheckpoint(SQLModel, table=True):
+    """
+    One completed node of a WorkflowRun: the branch handle it chose and
+    the changes it made to its context, as JSON {"set": {...}, "unset": [...]}.
+    """
+    run_id: int = Field(foreign_key="workflowrun.id", primary_key=True)
+    seq: int = Field(primary_key=True)
+    node_id: str
+    handle: Optional[str] = None
+    diff: str
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+
+
 class IntegrationConfig(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     type: str = Field(index=True)
@@ -0,0 +1,121 @@
+"""
+Keep a SQLite replica file in step with the primary, so read/write
+splitting can be exercised locally without a real replication setup.
+
+The copy uses SQLite's online backup API, which takes a consistent
+snapshot of the primary (WAL included) and rewrites the replica in place,
+so pooled replica connections see the new data on their next read.
+
+    python -m db.replica sync   # copy the primary onto the replica once
+"""
+import argparse
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Optional
+
+from sqlalchemy.engine.url import make_url
+
+from core.config import settings
+
+logger = logging.getLogger("db.replica")
+
+
+def sqlite_path(database_url: str) -> str:
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        raise ValueError(f"'{database_url}' is not a SQLite file URL")
+    return url.database
+
+
+def copy_database(primary_url: str, replica_url: str) -> None:
+    with closing(sqlite3.connect(sqlite_path(primary_url))) as source:
+        with closing(sqlite3.connect(sqlite_path(replica_url))) as target:
+            source.backup(target)
+
+
+class ReplicaSync:
+    """
+    Background thread copying the primary onto the replica every
+    `interval` seconds. Replica lag is therefore at most one interval
+    plus the copy time.
+    """
+
+    def __init__(self, primary_url: str, replica_url: Optional[str], interval: float):
+        self.primary_url = primary_url
+        self.replica_url = replica_url
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.copies = 0
+        self.errors = 0
+        self.last_copy_at: Optional[float] = None
+        self.last_copy_ms: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replica_url) and self.interval > 0
+
+    def sync_once(self) -> None:
+        started = time.perf_counter()
+        copy_database(self.primary_url, self.replica_url)
+        self.last_copy_ms = (time.perf_counter() - started) * 1000
+        self.last_copy_at = time.time()
+        self.copies += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sync_once()
+            except sqlite3.Error:
+                self.errors += 1
+                logger.exception("Replica sync failed")
+
+    def start(self) -> None:
+        """
+        Copy once synchronously, so the replica has the current schema
+        before the first request, then keep copying in the background.
+        """
+        if not self.enabled or self._thread is not None:
+            return
+        self.sync_once()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "interval_seconds": self.interval,
+            "copies": self.copies,
+            "errors": self.errors,
+            "last_copy_ms": self.last_copy_ms,
+            "lag_seconds": time.time() - self.last_copy_at if self.last_copy_at else None,
+        }
+
+
+replica_sync = ReplicaSync(
+    settings.database_url,
+    settings.replica_database_url,
+    settings.replica_sync_interval_seconds,
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite replica maintenance.")
+    parser.add_argument("command", choices=["sync"])
+    args = parser.parse_args()
+
+    if not settings.replica_database_url:
+        parser.error("REPLICA_DATABASE_URL is not set")
+    replica_sync.sync_once()
+    print(f"Copied {settings.database_url} -> {settings.replica_database_url} in {replica_sync.last_copy_ms:.0f} ms")
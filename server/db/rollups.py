@@ -0,0 +1,147 @@
+"""
+Ticket KPI rollups for the agent dashboard.
+
+`ticket_status_count` holds the number of tickets per status and
+`ticket_hourly_stats` the number of tickets created and closed per hour.
+The ticket endpoints update both in the same transaction as the ticket
+itself, so the stats endpoint reads a handful of rows instead of counting
+tickets.
+
+    python -m db.rollups rebuild   # recompute both tables from `ticket`
+"""
+import argparse
+import datetime
+from collections import Counter
+from typing import Dict
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from db.models import Ticket, TicketHourlyStats, TicketStatusCount
+
+CLOSED_STATUS = "closed"
+REBUILD_BATCH_SIZE = 1000
+
+status_table = TicketStatusCount.__table__
+hourly_table = TicketHourlyStats.__table__
+
+_UPSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def hour_bucket(moment: datetime.datetime) -> datetime.datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _increment(dialect: str, table, key: Dict, deltas: Dict[str, int]):
+    stmt = _UPSERTS[dialect](table).values(**key, **deltas)
+    return stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={column: table.c[column] + stmt.excluded[column] for column in deltas},
+    )
+
+
+async def _apply(session: AsyncSession, status_deltas: Counter, hourly_deltas: Dict) -> None:
+    dialect = session.bind.dialect.name
+    for status, delta in status_deltas.items():
+        if delta:
+            await session.execute(_increment(dialect, status_table, {"status": status}, {"count": delta}))
+    for bucket, deltas in hourly_deltas.items():
+        await session.execute(_increment(dialect, hourly_table, {"bucket": bucket}, deltas))
+
+
+def _closed_bucket(ticket: Ticket) -> datetime.datetime:
+    # Closed tickets from before closed_at was tracked fall back to updated_at.
+    return hour_bucket(ticket.closed_at or ticket.updated_at)
+
+
+async def record_ticket_created(session: AsyncSession, ticket: Ticket) -> None:
+    bucket = hour_bucket(ticket.created_at)
+    deltas = {"created": 1, "closed": 0}
+    if ticket.status == CLOSED_STATUS:
+        ticket.closed_at = ticket.created_at
+        deltas["closed"] = 1
+    await _apply(session, Counter({ticket.status: 1}), {bucket: deltas})
+
+
+async def record_status_change(
+    session: AsyncSession, ticket: Ticket, old_status: str, at: datetime.datetime
+) -> None:
+    """
+    Move `ticket` from `old_status` to its current status in the counts.
+    Closing it stamps `closed_at` and counts towards that hour; reopening
+    it takes the close back from the same hour, so each hour only counts
+    tickets that are still closed, exactly as `rebuild` does.
+    """
+    new_status = ticket.status
+    if old_status == new_status:
+        return
+    hourly = {}
+    if old_status == CLOSED_STATUS:
+        hourly[_closed_bucket(ticket)] = {"closed": -1}
+        ticket.closed_at = None
+    if new_status == CLOSED_STATUS:
+        ticket.closed_at = at
+        hourly[hour_bucket(at)] = {"closed": 1}
+    await _apply(session, Counter({old_status: -1, new_status: 1}), hourly)
+
+
+async def record_ticket_deleted(session: AsyncSession, ticket: Ticket) -> None:
+    hourly = {hour_bucket(ticket.created_at): {"created": -1}}
+    if ticket.status == CLOSED_STATUS:
+        hourly.setdefault(_closed_bucket(ticket), {})["closed"] = -1
+    await _apply(session, Counter({ticket.status: -1}), hourly)
+
+
+def rebuild(conn: Connection) -> int:
+    """
+    Recompute both rollups from the ticket table in a single pass and
+    return the number of tickets counted.
+    """
+    statuses: Counter = Counter()
+    created: Counter = Counter()
+    closed: Counter = Counter()
+    query = select(Ticket.status, Ticket.created_at, Ticket.updated_at, Ticket.closed_at)
+    result = conn.execution_options(yield_per=REBUILD_BATCH_SIZE).execute(query)
+    for status, created_at, updated_at, closed_at in result:
+        statuses[status] += 1
+        created[hour_bucket(created_at)] += 1
+        if status == CLOSED_STATUS:
+            closed[hour_bucket(closed_at or updated_at)] += 1
+
+    conn.execute(delete(status_table))
+    conn.execute(delete(hourly_table))
+    if statuses:
+        conn.execute(insert(status_table), [{"status": s, "count": n} for s, n in statuses.items()])
+    buckets = created.keys() | closed.keys()
+    if buckets:
+        conn.execute(insert(hourly_table), [
+            {"bucket": b, "created": created[b], "closed": closed[b]} for b in sorted(buckets)
+        ])
+    return sum(statuses.values())
+
+
+async def read_stats(session: AsyncSession, since: datetime.datetime):
+    """
+    Return ({status: count}, [hourly bucket rows since `since`]).
+    """
+    statuses = dict((await session.execute(select(status_table.c.status, status_table.c.count))).all())
+    query = (
+        select(hourly_table)
+        .where(hourly_table.c.bucket >= hour_bucket(since))
+        .order_by(hourly_table.c.bucket)
+    )
+    return statuses, (await session.execute(query)).mappings().all()
+
+
+if __name__ == "__main__":
+    from db.session import engine
+
+    parser = argparse.ArgumentParser(description="Ticket KPI rollups.")
+    parser.add_argument("command", choices=["rebuild"])
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        tickets = rebuild(conn)
+    print(f"Rebuilt ticket rollups from {tickets} tickets")
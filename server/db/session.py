@@ -1,13 +1,163 @@
+import logging
+import random
+import time
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, create_engine
-from core.config import settings
+from sqlmodel.ext.asyncio.session import AsyncSession
+from core.config import DatabaseProfile, settings
 
-# Create the SQLModel engine using the configured database URL
-engine = create_engine(settings.database_url, echo=True)
+sql_logger = logging.getLogger("db.sql")
 
-def get_session():
+def _apply_sqlite_pragmas(engine: Engine, pragmas: dict) -> None:
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def _install_sql_logging(engine: Engine, profile: DatabaseProfile) -> None:
+    """
+    Log a random sample of statements and every statement slower than the
+    profile threshold, instead of echoing everything.
+    """
+    sample_rate = profile.sql_log_sample_rate
+    slow_query_ms = profile.slow_query_ms
+    if sample_rate <= 0 and slow_query_ms <= 0:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        if slow_query_ms > 0 and elapsed_ms >= slow_query_ms:
+            sql_logger.warning("Slow query (%.1f ms): %s", elapsed_ms, statement)
+        elif sample_rate > 0 and random.random() < sample_rate:
+            sql_logger.info("(%.1f ms) %s", elapsed_ms, statement)
+
+def _engine_options(database_url: str, profile: DatabaseProfile) -> dict:
+    if database_url.startswith("sqlite") and ":memory:" in database_url:
+        return {}
+    options = {"pool_size": profile.pool_size, "max_overflow": profile.max_overflow}
+    if not database_url.startswith("sqlite"):
+        options.update(pool_pre_ping=profile.pool_pre_ping, pool_recycle=profile.pool_recycle)
+    return options
+
+def _configure_engine(engine: Engine, database_url: str, profile: DatabaseProfile) -> None:
+    if database_url.startswith("sqlite") and ":memory:" not in database_url:
+        _apply_sqlite_pragmas(engine, profile.sqlite_pragmas)
+    _install_sql_logging(engine, profile)
+
+def build_engine(database_url: str, profile: DatabaseProfile) -> Engine:
+    """
+    Create an engine tuned by `profile`: pragmas for SQLite files, pool
+    sizing for every pooled database, and sampled/slow SQL logging.
+    """
+    engine = create_engine(database_url, **_engine_options(database_url, profile))
+    _configure_engine(engine, database_url, profile)
+    return engine
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def to_async_url(database_url: str) -> str:
+    """
+    Map a sync database URL onto its asyncio driver, e.g.
+    sqlite:///./x.db -> sqlite+aiosqlite:///./x.db.
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def build_async_engine(database_url: str, profile: DatabaseProfile) -> AsyncEngine:
+    """
+    Async counterpart of build_engine, sharing the same profile.
+    """
+    engine = create_async_engine(to_async_url(database_url), **_engine_options(database_url, profile))
+    _configure_engine(engine.sync_engine, database_url, profile)
+    return engine
+
+# Create the SQLModel engines using the configured database URL and profile.
+# The sync engine stays available for startup tasks and scripts.
+engine = build_engine(settings.database_url, settings.database_profile)
+async_engine = build_async_engine(settings.database_url, settings.database_profile)
+
+# Optional replica engines; reporting code that never writes can use
+# `read_engine` directly.
+replica_engine: Optional[Engine] = None
+async_replica_engine: Optional[AsyncEngine] = None
+if settings.replica_database_url:
+    replica_engine = build_engine(settings.replica_database_url, settings.database_profile)
+    async_replica_engine = build_async_engine(settings.replica_database_url, settings.database_profile)
+read_engine = replica_engine or engine
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+class RoutingSession(Session):
+    """
+    Session that reads from the replica until it writes. Flushes and DML
+    always go to the primary, and once the session has written so does
+    every later statement, so it reads its own writes. Reads that must
+    not be stale opt out with `.execution_options(use_primary=True)`.
+    """
+
+    def __init__(self, *args, primary: Engine, replica: Optional[Engine] = None, read_only: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.primary = primary
+        self.replica = replica if read_only else None
+        self.wrote = False
+
+    def use_primary(self) -> None:
+        """
+        Send every later statement to the primary, e.g. before filling a
+        cache that must not be seeded from a lagging replica.
+        """
+        self.replica = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.wrote = True
+        if self.replica is not None and not self.wrote:
+            if clause is None or not clause.get_execution_options().get("use_primary"):
+                return self.replica
+        return self.primary
+
+def get_session(request: Request):
     """
     Yield a SQLModel Session instance,
     to be used as a dependency in FastAPI endpoints.
     """
-    with Session(engine) as session:
+    with RoutingSession(
+        bind=engine,
+        primary=engine,
+        replica=replica_engine,
+        read_only=request.method in READ_METHODS,
+    ) as session:
+        yield session
+
+async def get_async_session(request: Request):
+    """
+    Yield an AsyncSession for `async def` endpoints. Objects stay loaded
+    after commit so responses can be built without implicit IO.
+    """
+    async with AsyncSession(
+        async_engine,
+        sync_session_class=RoutingSession,
+        expire_on_commit=False,
+        primary=async_engine.sync_engine,
+        replica=async_replica_engine.sync_engine if async_replica_engine else None,
+        read_only=request.method in READ_METHODS,
+    ) as session:
         yield session
@@ -1,20 +1,28 @@
-from fastapi import FastAPI
+import logging
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import SQLModel, Session, select
-from sqlalchemy.exc import OperationalError
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlmodel import Session, select
 from core.config import settings
-from db.session import engine
-from core.security import get_password_hash
+from db.session import async_engine, async_replica_engine, engine
+from core.security import PasswordHasherBusy, get_password_hash, password_hasher
+from db import migrations
+from db.replica import replica_sync
 from db.models import Role, User
+from core.permissions import permission_resolver
+from core.pagination import NEXT_CURSOR_HEADER
+from core.events import event_hub
+from db.group_commit import WriteBufferFull, message_writer
+from services.workflow.runner import workflow_workers
+
+# The server is the one place that configures the root logger; library
+# modules only create named loggers.
+logging.basicConfig(level=settings.log_level, format='%(asctime)s - %(levelname)s - %(message)s')
 
 def create_db_and_tables():
-    from sqlalchemy import text
-    with engine.connect() as conn:
-        conn.execute(text("DROP INDEX IF EXISTS ix_permission_name"))
-    try:
-        SQLModel.metadata.create_all(engine)
-    except OperationalError:
-        pass
+    # A single SELECT on the common path; migrations only run when behind.
+    if not migrations.is_current(engine):
+        migrations.upgrade(engine)
 
 def create_initial_data():
     """
@@ -43,12 +51,15 @@ def create_initial_data():
             session.add(admin_user)
             session.commit()
 
+        permission_resolver.compile(session)
+
 app = FastAPI(
     title="Service Desk API",
     version="0.1.0",
     description="API for user management, workflows, integrations and more.",
     docs_url="/",
     redoc_url=None,
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS to allow React local development server
@@ -64,12 +75,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+@app.exception_handler(PasswordHasherBusy)
+def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication service is busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(WriteBufferFull)
+def write_buffer_full_handler(request: Request, exc: WriteBufferFull):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Message write queue is full, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     create_db_and_tables()
     create_initial_data()
+    replica_sync.start()
+    await event_hub.start()
+    await message_writer.start()
+    await workflow_workers.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await workflow_workers.stop()
+    await message_writer.stop()
+    await event_hub.stop()
+    password_hasher.shutdown()
+    replica_sync.stop()
+    await async_engine.dispose()
+    if async_replica_engine is not None:
+        await async_replica_engine.dispose()
 
 # Mount Auth router
 from api.v1.endpoints.auth import router as auth_router
@@ -89,12 +132,27 @@ app.include_router(tickets_router, prefix="/api/v1/tickets", tags=["Tickets"])
 from api.v1.endpoints.messages import router as messages_router
 app.include_router(messages_router, prefix="/api/v1/messages", tags=["Messages"])
 
-# from api.v1.endpoints.workflows import router as workflows_router
-# app.include_router(workflows_router, prefix="/api/v1/workflows", tags=["Workflows"])
+from api.v1.endpoints.workflows import router as workflows_router
+app.include_router(workflows_router, prefix="/api/v1/workflows", tags=["Workflows"])
 
 from api.v1.endpoints.agents import router as agents_router
 app.include_router(agents_router, prefix="/api/v1/agents", tags=["Agents"])
 
+from api.v1.endpoints.exports import router as exports_router
+app.include_router(exports_router, prefix="/api/v1/exports", tags=["Exports"])
+
+from api.v1.endpoints.search import router as search_router
+app.include_router(search_router, prefix="/api/v1/search", tags=["Search"])
+
+from api.v1.endpoints.stats import router as stats_router
+app.include_router(stats_router, prefix="/api/v1/stats", tags=["Stats"])
+
+from api.v1.endpoints.events import router as events_router
+app.include_router(events_router, prefix="/api/v1/events", tags=["Events"])
+
+from api.v1.endpoints.metrics import router as metrics_router
+app.include_router(metrics_router, prefix="/api/v1/metrics", tags=["Metrics"])
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
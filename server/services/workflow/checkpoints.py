@@ -0,0 +1,199 @@
+"""
+Per-node checkpoints for workflow runs.
+
+After each node completes, the run records which branch handle the node
+chose and what it changed in its context: only the top-level keys it set
+or removed, never a copy of the whole context. Resuming replays that log
+from the run's initial inputs. Recorded visits are not executed again;
+their handle and changes are applied as-is, and execution continues live
+from the first visit the log does not cover.
+
+Sequential runs may visit a node many times (a decision can loop back),
+so their log is replayed in order, one entry per visit. DAG runs visit
+each node at most once but finish them in no fixed order, so their log
+is matched by node.
+
+Rows go through a GroupCommitWriter, so a node never waits on the
+database. A crash can lose the last few milliseconds of checkpoints, and
+those nodes simply run again.
+"""
+import asyncio
+import datetime
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+import orjson
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from db.group_commit import GroupCommitWriter, WriteBufferFull
+from db.models import WorkflowCheckpoint
+
+logger = logging.getLogger("services.workflow.checkpoints")
+
+_MISSING = object()
+
+
+class NodeCheckpoint(NamedTuple):
+    handle: Optional[str]
+    changes: Dict[str, Any]
+    removed: List[str]
+
+
+def context_diff(before: Dict[str, Any], after: Dict[str, Any]) -> NodeCheckpoint:
+    """
+    Top-level keys that are new or rebound in `after`, and keys that are
+    gone. Values are compared by identity, so this costs one pass over
+    the keys however large the values are.
+    """
+    changes = {k: v for k, v in after.items() if before.get(k, _MISSING) is not v}
+    removed = [k for k in before if k not in after]
+    return NodeCheckpoint(None, changes, removed)
+
+
+def apply_diff(context: Dict[str, Any], checkpoint: NodeCheckpoint) -> None:
+    for key in checkpoint.removed:
+        context.pop(key, None)
+    context.update(checkpoint.changes)
+
+
+class RunCheckpoints:
+    """
+    Checkpoint log of one run attempt: the node visits completed by
+    earlier attempts, in seq order, which are replayed, and the writer
+    that receives new ones. `record` may be called from worker threads.
+
+    With `ordered` (sequential runs) a cursor walks the log once per
+    visit; the first visit that does not match the next entry, or comes
+    after the last one, switches the attempt to live execution for good,
+    so entries past a divergence are never replayed. Otherwise (DAG runs)
+    each node replays its own entries, in order.
+    """
+
+    def __init__(
+        self,
+        run_id: int,
+        writer: GroupCommitWriter,
+        log: List[Tuple[str, NodeCheckpoint]],
+        next_seq: int,
+        ordered: bool = True,
+    ):
+        self.run_id = run_id
+        self.writer = writer
+        self.log = log
+        self.ordered = ordered
+        self.next_seq = next_seq
+        self.recorded = 0
+        self._cursor = 0
+        self._by_node: Dict[str, Deque[NodeCheckpoint]] = {}
+        if not ordered:
+            for node_id, checkpoint in log:
+                self._by_node.setdefault(node_id, deque()).append(checkpoint)
+        self._loop = asyncio.get_running_loop()
+        self._last: Optional[asyncio.Future] = None
+        self._broken = False
+
+    @classmethod
+    async def load(
+        cls, conn: AsyncConnection, run_id: int, writer: GroupCommitWriter, ordered: bool = True
+    ) -> "RunCheckpoints":
+        """
+        Read the run's checkpoints. The log is only trusted up to its first
+        gap (a lost batch); anything after it is deleted and runs again.
+        """
+        rows = (await conn.execute(
+            select(WorkflowCheckpoint.seq, WorkflowCheckpoint.node_id, WorkflowCheckpoint.handle, WorkflowCheckpoint.diff)
+            .where(WorkflowCheckpoint.run_id == run_id)
+            .order_by(WorkflowCheckpoint.seq)
+        )).all()
+        log: List[Tuple[str, NodeCheckpoint]] = []
+        seq = 0
+        for row in rows:
+            if row.seq != seq + 1:
+                await conn.execute(
+                    delete(WorkflowCheckpoint)
+                    .where(WorkflowCheckpoint.run_id == run_id, WorkflowCheckpoint.seq > seq)
+                )
+                await conn.commit()
+                break
+            diff = orjson.loads(row.diff)
+            log.append((row.node_id, NodeCheckpoint(row.handle, diff["set"], diff["unset"])))
+            seq = row.seq
+        return cls(run_id, writer, log, seq + 1, ordered)
+
+    def peek(self, node_id: str) -> Optional[NodeCheckpoint]:
+        """
+        The checkpoint the next visit of `node_id` would replay, if any.
+        """
+        if not self.ordered:
+            visits = self._by_node.get(node_id)
+            return visits[0] if visits else None
+        if self._cursor < len(self.log) and self.log[self._cursor][0] == node_id:
+            return self.log[self._cursor][1]
+        return None
+
+    def replay(self, node_id: str) -> Optional[NodeCheckpoint]:
+        """
+        Consume the checkpoint of this visit of `node_id`, or return None
+        when the visit has to run live.
+        """
+        if not self.ordered:
+            visits = self._by_node.get(node_id)
+            return visits.popleft() if visits else None
+        checkpoint = self.peek(node_id)
+        if checkpoint is not None:
+            self._cursor += 1
+            return checkpoint
+        if self._cursor < len(self.log):
+            logger.warning(
+                "Checkpoints of workflow run %s expected node %s but reached %s; running live from here",
+                self.run_id, self.log[self._cursor][0], node_id,
+            )
+        self._cursor = len(self.log)
+        return None
+
+    def record(self, node_id: str, handle: Optional[str], before: Dict[str, Any], after: Dict[str, Any]) -> None:
+        _, changes, removed = context_diff(before, after)
+        # Encode here so the values are captured as they are now.
+        diff = orjson.dumps({"set": changes, "unset": removed}, default=str).decode()
+        self._loop.call_soon_threadsafe(self._enqueue, node_id, handle, diff)
+
+    def _enqueue(self, node_id: str, handle: Optional[str], diff: str) -> None:
+        if self._broken:
+            return
+        try:
+            future = self.writer.enqueue({
+                "run_id": self.run_id,
+                "seq": self.next_seq,
+                "node_id": node_id,
+                "handle": handle,
+                "diff": diff,
+                "created_at": datetime.datetime.utcnow(),
+            })
+        except (WriteBufferFull, RuntimeError):
+            # A gap would make later checkpoints unusable; stop recording
+            # and let a resume re-run from here.
+            logger.warning("Checkpointing for workflow run %s stopped at node %s", self.run_id, node_id)
+            self._broken = True
+            return
+        future.add_done_callback(_consume)
+        self._last = future
+        self.next_seq += 1
+        self.recorded += 1
+
+    async def flush(self) -> None:
+        """
+        Wait until every checkpoint recorded so far is committed (or its
+        batch has failed).
+        """
+        # Let `record` calls made from worker threads reach the loop first.
+        await asyncio.sleep(0)
+        if self._last is not None:
+            await asyncio.wait([self._last])
+
+
+def _consume(future: asyncio.Future) -> None:
+    # Failed batches are already logged by the writer.
+    if not future.cancelled():
+        future.exception()
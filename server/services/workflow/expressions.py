@@ -0,0 +1,149 @@
+"""
+Safe, precompiled conditions for DecisionPointNode.
+
+A condition is a single Python expression over `context`, restricted to:
+
+    literals            'accept', 42, -1.5, True, None, [1, 2], ('a', 'b')
+    context lookups     context['key'], context['output_x']['decision']
+    .get on a mapping   context.get('key'), context['x'].get('y', 'default')
+    comparisons         == != < <= > >= in, not in, is, is not
+    boolean logic       and, or, not
+
+It is parsed and checked once, when the plan is compiled (or the workflow
+saved), and turned into a plain function of the context. Names other than
+`context`, attribute access other than `.get`, calls, arithmetic,
+comprehensions and lambdas are all rejected, so a condition cannot reach
+builtins or module globals.
+"""
+import ast
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, List
+
+MAX_CONDITION_LENGTH = 2000
+
+Condition = Callable[[Mapping], Any]
+
+_COMPARE_OPS = (
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.In, ast.NotIn, ast.Is, ast.IsNot,
+)
+_GET = "__get"
+
+
+class ExpressionError(ValueError):
+    """
+    A condition that does not parse or uses something outside the
+    allowed subset.
+    """
+
+
+def _get(target: Any, key: Any, default: Any = None) -> Any:
+    # Only mappings: `.get` must not become a way to call arbitrary methods.
+    if not isinstance(target, Mapping):
+        raise TypeError(f"'.get' needs a mapping, got {type(target).__name__}")
+    return target.get(key, default)
+
+
+class _Validator(ast.NodeTransformer):
+    """
+    Reject anything outside the subset and rewrite `x.get(...)` into a
+    call to the mapping-only `_get` helper.
+    """
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        raise ExpressionError(f"'{type(node).__name__}' is not allowed in a condition")
+
+    def visit_Expression(self, node: ast.Expression) -> ast.AST:
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if not isinstance(node.value, (str, int, float, bool, type(None))):
+            raise ExpressionError(f"Literal {node.value!r} is not allowed in a condition")
+        return node
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id != "context":
+            raise ExpressionError(f"Unknown name '{node.id}'; conditions can only read 'context'")
+        return node
+
+    def visit_Subscript(self, node: ast.Subscript) -> ast.AST:
+        if isinstance(node.slice, ast.Slice):
+            raise ExpressionError("Slices are not allowed in a condition")
+        node.value = self.visit(node.value)
+        node.slice = self.visit(node.slice)
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        func = node.func
+        if not (isinstance(func, ast.Attribute) and func.attr == "get") or node.keywords or not 1 <= len(node.args) <= 2:
+            raise ExpressionError("The only call allowed in a condition is .get(key[, default])")
+        args = [self.visit(func.value), *(self.visit(arg) for arg in node.args)]
+        return ast.copy_location(ast.Call(ast.Name(_GET, ast.Load()), args, []), node)
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:
+        for op in node.ops:
+            if not isinstance(op, _COMPARE_OPS):
+                raise ExpressionError(f"Comparison '{type(op).__name__}' is not allowed in a condition")
+        node.left = self.visit(node.left)
+        node.comparators = [self.visit(c) for c in node.comparators]
+        return node
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.AST:
+        node.values = [self.visit(v) for v in node.values]
+        return node
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        if isinstance(node.op, ast.Not) or (
+            isinstance(node.op, ast.USub) and isinstance(node.operand, ast.Constant)
+        ):
+            node.operand = self.visit(node.operand)
+            return node
+        raise ExpressionError(f"Operator '{type(node.op).__name__}' is not allowed in a condition")
+
+    def _visit_sequence(self, node):
+        node.elts = [self.visit(e) for e in node.elts]
+        return node
+
+    visit_List = visit_Tuple = visit_Set = _visit_sequence
+
+
+def compile_condition(source: str) -> Condition:
+    """
+    Check `source` against the allowed subset and return a function that
+    evaluates it for a given context. Raises ExpressionError.
+    """
+    if not isinstance(source, str) or not source.strip():
+        raise ExpressionError("Condition is empty")
+    if len(source) > MAX_CONDITION_LENGTH:
+        raise ExpressionError(f"Condition is longer than {MAX_CONDITION_LENGTH} characters")
+    # Compile `lambda context: <expr>` once; evaluating it is then a plain
+    # function call with no builtins in scope.
+    args = ast.arguments(posonlyargs=[], args=[ast.arg("context")], kwonlyargs=[], kw_defaults=[], defaults=[])
+    try:
+        tree = _Validator().visit(ast.parse(source.strip(), mode="eval"))
+        function = ast.fix_missing_locations(ast.Expression(ast.Lambda(args, tree.body)))
+        code = compile(function, "<condition>", "eval")
+    except SyntaxError as exc:
+        raise ExpressionError(f"Invalid syntax: {exc.msg}") from None
+    except (RecursionError, MemoryError):
+        raise ExpressionError("Condition is nested too deeply") from None
+    return eval(code, {"__builtins__": {}, _GET: _get})
+
+
+def check_conditions(nodes_data: Iterable[Dict]) -> List[Dict[str, str]]:
+    """
+    Compile the condition of every decisionPoint node in a saved graph and
+    return one {"node_id", "error"} entry per condition that fails.
+    """
+    errors = []
+    for node in nodes_data:
+        if not isinstance(node, dict) or node.get("type") != "decisionPoint":
+            continue
+        data = node.get("data") if isinstance(node.get("data"), dict) else {}
+        condition = data.get("condition", node.get("condition"))
+        try:
+            compile_condition(condition)
+        except ExpressionError as exc:
+            errors.append({"node_id": str(node.get("id")), "error": str(exc)})
+    return errors
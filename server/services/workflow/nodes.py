@@ -1,7 +1,7 @@
 # nodes.py
 
 from typing import Any, Dict, List, Literal, Type
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from crewai import Agent, Task
 from crewai_tools import SerperDevTool, FileReadTool
 
@@ -17,6 +17,9 @@ def register_node(cls: Type["BaseNode"]):
 
 class BaseNode(BaseModel):
     """The base class for all nodes in the workflow."""
+    # Nodes live in compiled plans shared between runs.
+    model_config = ConfigDict(frozen=True)
+
     id: str
     type: str
     data: Dict[str, Any] = Field(default_factory=dict)
@@ -50,7 +53,15 @@ class OutputNode(BaseNode):
 class DecisionPointNode(BaseNode):
     """Evaluates a condition and directs the flow to a 'true' or 'false' path."""
     type: Literal["decisionPoint"] = "decisionPoint"
-    condition: str = Field(description="Python expression to evaluate against the context.")
+    condition: str = Field(description="Expression over the context; see services/workflow/expressions.py for what is allowed.")
+
+@register_node
+class JoinNode(BaseNode):
+    """
+    Merges parallel branches in DAG mode: waits for every incoming branch
+    that is taken and combines their contexts (a pass-through otherwise).
+    """
+    type: Literal["joinNode"] = "joinNode"
 
 # ----------------- ACTION & AGENT NODES -----------------
 
@@ -0,0 +1,222 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Hashable, List, Mapping, NamedTuple, Optional, Tuple
+
+import orjson
+
+from core.config import settings
+from services.workflow.expressions import Condition, ExpressionError, compile_condition
+from services.workflow.nodes import NODE_REGISTRY, AutomationAgentNode, BaseNode, DecisionPointNode
+
+
+class Edge(NamedTuple):
+    source: str
+    target: str
+    source_handle: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class WorkflowPlan:
+    """
+    Everything about a workflow that does not depend on a particular run:
+    validated nodes, outgoing edges per node, the entry point, compiled
+    decision conditions and the CrewAI agents. Built once by
+    `compile_plan` and shared by every run.
+
+    Agents are templates: runs execute tasks on `agent.copy()`, which is
+    cheap and keeps CrewAI's per-execution state out of the shared plan.
+    `incoming` and `dag_error` serve DAG mode: the edges into each node
+    from nodes reachable from the input, and why the graph cannot be
+    scheduled as a DAG (None when it can).
+    """
+
+    nodes: Mapping[str, BaseNode]
+    edges: Mapping[str, Tuple[Edge, ...]]
+    input_node_id: str
+    conditions: Mapping[str, Condition]
+    agents: Mapping[str, Any]
+    incoming: Mapping[str, Tuple[Edge, ...]]
+    dag_error: Optional[str]
+
+    def next_node_id(self, source_node_id: str, source_handle: Optional[str] = None) -> Optional[str]:
+        connections = self.edges.get(source_node_id, ())
+        if not connections:
+            return None
+        if source_handle:
+            for edge in connections:
+                if edge.source_handle == source_handle:
+                    return edge.target
+            return None
+        return connections[0].target
+
+
+def _load_nodes(nodes_data: List[Dict]) -> Dict[str, BaseNode]:
+    loaded_nodes = {}
+    for node_data in nodes_data:
+        node_type = node_data.get("type")
+        node_class = NODE_REGISTRY.get(node_type)
+        if not node_class:
+            raise ValueError(f"Unknown node type: {node_type}")
+        combined_data = {**node_data, **node_data.get("data", {})}
+        loaded_nodes[node_data["id"]] = node_class(**combined_data)
+    return loaded_nodes
+
+
+def _build_edge_map(edges_data: List[Dict]) -> Dict[str, Tuple[Edge, ...]]:
+    edge_map: Dict[str, List[Edge]] = {}
+    for edge in edges_data:
+        edge_map.setdefault(edge["source"], []).append(
+            Edge(edge["source"], edge["target"], edge.get("sourceHandle"))
+        )
+    return {source: tuple(edges) for source, edges in edge_map.items()}
+
+
+def _find_node_by_type(nodes: Mapping[str, BaseNode], node_type: str) -> str:
+    for node_id, node in nodes.items():
+        if node.type == node_type:
+            return node_id
+    raise ValueError(f"Workflow is missing a '{node_type}'")
+
+
+def _compile_conditions(nodes: Mapping[str, BaseNode]) -> Dict[str, Condition]:
+    conditions = {}
+    for node in nodes.values():
+        if isinstance(node, DecisionPointNode):
+            try:
+                conditions[node.id] = compile_condition(node.condition)
+            except ExpressionError as exc:
+                raise ExpressionError(f"Decision '{node.id}': {exc}") from None
+    return conditions
+
+
+def _dag_shape(
+    nodes: Mapping[str, BaseNode], edges: Mapping[str, Tuple[Edge, ...]], input_node_id: str
+) -> Tuple[Dict[str, Tuple[Edge, ...]], Optional[str]]:
+    """
+    Incoming edges of the part of the graph reachable from the input
+    node, and the reason it is not a DAG (unknown target or a cycle).
+    """
+    reachable = {input_node_id}
+    stack = [input_node_id]
+    while stack:
+        for edge in edges.get(stack.pop(), ()):
+            if edge.target not in nodes:
+                return {}, f"Edge from '{edge.source}' points to unknown node '{edge.target}'"
+            if edge.target not in reachable:
+                reachable.add(edge.target)
+                stack.append(edge.target)
+
+    incoming: Dict[str, List[Edge]] = {}
+    for source in reachable:
+        for edge in edges.get(source, ()):
+            incoming.setdefault(edge.target, []).append(edge)
+
+    # Kahn's algorithm: anything left unvisited sits on a cycle.
+    remaining = {node_id: len(incoming.get(node_id, ())) for node_id in reachable}
+    ready = [node_id for node_id, count in remaining.items() if count == 0]
+    visited = 0
+    while ready:
+        visited += 1
+        for edge in edges.get(ready.pop(), ()):
+            remaining[edge.target] -= 1
+            if remaining[edge.target] == 0:
+                ready.append(edge.target)
+    if visited < len(reachable):
+        looped = sorted(node_id for node_id, count in remaining.items() if count > 0)
+        return {}, f"Workflow graph has a cycle (nodes on or after it: {', '.join(looped)})"
+
+    # Keep the order edges were declared in; joins merge branches in it.
+    order = {edge: i for i, edge in enumerate(e for group in edges.values() for e in group)}
+    return {target: tuple(sorted(group, key=order.__getitem__)) for target, group in incoming.items()}, None
+
+
+def compile_plan(nodes_data: List[Dict], edges_data: List[Dict]) -> WorkflowPlan:
+    """
+    Validate a React Flow style node/edge graph and build its plan.
+    Raises ValueError for unknown node types, a missing input node or an
+    invalid decision condition.
+    """
+    nodes = _load_nodes(nodes_data)
+    conditions = _compile_conditions(nodes)
+    edges = _build_edge_map(edges_data)
+    input_node_id = _find_node_by_type(nodes, "inputNode")
+    incoming, dag_error = _dag_shape(nodes, edges, input_node_id)
+    return WorkflowPlan(
+        nodes=MappingProxyType(nodes),
+        edges=MappingProxyType(edges),
+        input_node_id=input_node_id,
+        conditions=MappingProxyType(conditions),
+        incoming=MappingProxyType(incoming),
+        dag_error=dag_error,
+        agents=MappingProxyType({
+            node.id: node.to_crewai_agent()
+            for node in nodes.values() if isinstance(node, AutomationAgentNode)
+        }),
+    )
+
+
+def content_key(nodes_data: List[Dict], edges_data: List[Dict]) -> str:
+    """
+    Cache key for an ad-hoc graph: a hash of its canonical JSON, so the
+    same graph sent twice (in any key order) maps to the same plan.
+    """
+    body = orjson.dumps({"nodes": nodes_data, "edges": edges_data}, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(body).hexdigest()
+
+
+class PlanCache:
+    """
+    Thread-safe LRU of compiled plans. Keys are either `content_key` of
+    the graph or, for stored workflows, (id, updated_at) so an edit
+    naturally stops hitting the old plan.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._plans: "OrderedDict[Hashable, WorkflowPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compile(self, key: Hashable, compile: Callable[[], WorkflowPlan]) -> WorkflowPlan:
+        """
+        Return the plan cached under `key`, calling `compile()` to build it
+        on a miss; the graph only has to be loaded when it is needed.
+        """
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+        # Compile outside the lock; two racing misses both compile and the
+        # first one stored wins, which is harmless.
+        plan = compile()
+        if self.max_entries <= 0:
+            return plan
+        with self._lock:
+            plan = self._plans.setdefault(key, plan)
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+        return plan
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._plans),
+                "max_entries": self.max_entries,
+            }
+
+
+plan_cache = PlanCache(max_entries=settings.workflow_plan_cache_size)
@@ -0,0 +1,251 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+import socket
+import uuid
+from typing import Any, Dict, List, Optional
+
+import orjson
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.config import settings
+from db.group_commit import GroupCommitWriter
+from db.models import WorkflowCheckpoint, WorkflowRun
+from db.session import async_engine
+from services.workflow.checkpoints import RunCheckpoints
+from services.workflow.plan import WorkflowPlan, compile_plan, content_key, plan_cache
+from services.workflow.workflow import WorkflowManager
+
+logger = logging.getLogger("services.workflow.runner")
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+def plan_for_graph(graph: Dict[str, Any]) -> WorkflowPlan:
+    """
+    Compiled plan for a {"nodes": [...], "edges": [...]} graph, shared
+    through the plan cache by content. Raises ValueError if invalid.
+    """
+    if not isinstance(graph, dict):
+        raise ValueError("Workflow graph must be a JSON object with nodes and edges")
+    nodes, edges = graph.get("nodes", []), graph.get("edges", [])
+    return plan_cache.get_or_compile(content_key(nodes, edges), lambda: compile_plan(nodes, edges))
+
+
+class WorkflowWorkerPool:
+    """
+    Executes submitted WorkflowRun rows in the background, at most
+    `concurrency` at a time. The table is the source of truth: a worker
+    claims a run by flipping it from queued to running and taking a lease
+    on it (the pool's worker_id plus a heartbeat_at the pool renews every
+    lease_seconds / 3). A running run whose lease has expired belonged to
+    a process that is gone; every pool re-queues those on start and then
+    periodically, so several processes can each run a pool without taking
+    over runs another one is still executing. With a `checkpoint_writer`,
+    a run that is picked up again continues from its last checkpoint.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        concurrency: int,
+        lease_seconds: float = 30.0,
+        checkpoint_writer: Optional[GroupCommitWriter] = None,
+    ):
+        self.engine = engine
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.checkpoint_writer = checkpoint_writer
+        self.worker_id: Optional[str] = None
+        self._queue: Optional["asyncio.Queue[int]"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.requeued = 0
+
+    async def start(self) -> None:
+        if self._tasks or self.concurrency <= 0:
+            return
+        # New on every start: runs abandoned by an earlier start of this
+        # pool are not being executed any more either.
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        if self.checkpoint_writer is not None:
+            await self.checkpoint_writer.start()
+        async with self.engine.begin() as conn:
+            await self._requeue_expired(conn)
+            queued = await conn.execute(
+                select(WorkflowRun.id).where(WorkflowRun.status == QUEUED).order_by(WorkflowRun.id)
+            )
+            for run_id in queued.scalars():
+                self._queue.put_nowait(run_id)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self) -> None:
+        """
+        Stop taking work. Runs still executing are abandoned; they stay
+        marked running until their lease expires, and are then picked up
+        again by whichever pool notices first.
+        """
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.checkpoint_writer is not None:
+            await self.checkpoint_writer.stop()
+        self._loop = None
+
+    def submit(self, run_id: int) -> None:
+        """
+        Hand a freshly committed run to the workers. Safe to call from any
+        thread; a no-op when the pool is not running in this process.
+        """
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, run_id)
+
+    async def _work(self) -> None:
+        while True:
+            run_id = await self._queue.get()
+            try:
+                if await self._claim(run_id):
+                    self.running += 1
+                    try:
+                        await self._execute(run_id)
+                    finally:
+                        self.running -= 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Workflow run %s could not be processed", run_id)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self.engine.begin() as conn:
+                    await conn.execute(
+                        update(WorkflowRun)
+                        .where(WorkflowRun.worker_id == self.worker_id, WorkflowRun.status == RUNNING)
+                        .values(heartbeat_at=datetime.datetime.utcnow())
+                    )
+                    for run_id in await self._requeue_expired(conn):
+                        self._queue.put_nowait(run_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Workflow run leases could not be renewed")
+
+    async def _requeue_expired(self, conn) -> List[int]:
+        """
+        Queue running runs whose lease has expired again and return their
+        ids. Runs from before leases existed have no heartbeat at all.
+        """
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=self.lease_seconds)
+        expired = (
+            (WorkflowRun.status == RUNNING)
+            & or_(WorkflowRun.heartbeat_at.is_(None), WorkflowRun.heartbeat_at < cutoff)
+        )
+        run_ids = list((await conn.execute(
+            select(WorkflowRun.id).where(expired).order_by(WorkflowRun.id)
+        )).scalars())
+        if run_ids:
+            result = await conn.execute(
+                update(WorkflowRun)
+                .where(WorkflowRun.id.in_(run_ids), expired)
+                .values(status=QUEUED, worker_id=None, heartbeat_at=None)
+            )
+            self.requeued += result.rowcount
+        return run_ids
+
+    async def _claim(self, run_id: int) -> bool:
+        now = datetime.datetime.utcnow()
+        async with self.engine.begin() as conn:
+            result = await conn.execute(
+                update(WorkflowRun)
+                .where(WorkflowRun.id == run_id, WorkflowRun.status == QUEUED)
+                .values(
+                    status=RUNNING,
+                    started_at=now,
+                    attempts=WorkflowRun.attempts + 1,
+                    worker_id=self.worker_id,
+                    heartbeat_at=now,
+                )
+            )
+        return result.rowcount == 1
+
+    async def _execute(self, run_id: int) -> None:
+        loop = asyncio.get_running_loop()
+        checkpoints = None
+        async with self.engine.connect() as conn:
+            run = (await conn.execute(
+                select(WorkflowRun.graph_json, WorkflowRun.inputs, WorkflowRun.mode).where(WorkflowRun.id == run_id)
+            )).one()
+            if self.checkpoint_writer is not None:
+                checkpoints = await RunCheckpoints.load(
+                    conn, run_id, self.checkpoint_writer, ordered=run.mode != "dag"
+                )
+        try:
+            # Compiling may build CrewAI agents; keep it off the event loop.
+            plan = await loop.run_in_executor(None, plan_for_graph, json.loads(run.graph_json))
+            manager = WorkflowManager.from_plan(plan)
+            if run.mode == "dag":
+                result = await manager.run_dag(run.inputs, checkpoints)
+            else:
+                result = await loop.run_in_executor(None, manager.run, run.inputs, checkpoints)
+            # Contexts may hold values the JSON column cannot store as-is.
+            values = {"status": COMPLETED, "result": orjson.loads(orjson.dumps(result, default=str))}
+            self.completed += 1
+        except Exception as exc:
+            logger.exception("Workflow run %s failed", run_id)
+            values = {"status": FAILED, "error": f"{type(exc).__name__}: {exc}"}
+            self.failed += 1
+        if checkpoints is not None:
+            # A resume must see every checkpoint of this attempt.
+            await checkpoints.flush()
+        async with self.engine.begin() as conn:
+            # Only while the lease is still ours: once it has expired the
+            # run belongs to whichever worker picked it up again.
+            result = await conn.execute(
+                update(WorkflowRun)
+                .where(WorkflowRun.id == run_id, WorkflowRun.worker_id == self.worker_id)
+                .values(finished_at=datetime.datetime.utcnow(), **values)
+            )
+        if result.rowcount == 0:
+            logger.warning("Workflow run %s lost its lease; its outcome was discarded", run_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "workers": self.concurrency if self._tasks else 0,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "requeued": self.requeued,
+            "checkpoints": self.checkpoint_writer.stats() if self.checkpoint_writer is not None else None,
+        }
+
+
+checkpoint_writer = GroupCommitWriter(
+    async_engine,
+    WorkflowCheckpoint,
+    max_rows=256,
+    max_delay_ms=settings.workflow_checkpoint_batch_max_delay_ms,
+    max_pending=10000,
+)
+workflow_workers = WorkflowWorkerPool(
+    async_engine,
+    concurrency=settings.workflow_workers,
+    lease_seconds=settings.workflow_lease_seconds,
+    checkpoint_writer=checkpoint_writer if settings.workflow_checkpoints else None,
+)
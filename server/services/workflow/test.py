@@ -1,6 +1,7 @@
+import logging
 from pprint import pprint
 from dotenv import load_dotenv
-from workflow import WorkflowManager
+from services.workflow.workflow import WorkflowManager
 
 load_dotenv()
 
@@ -59,6 +60,7 @@ def define_sla_verification_workflow():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     print("--- Defining SLA Verification Workflow ---")
     sample_workflow = define_sla_verification_workflow()
     print("Workflow defined for issue:", sample_workflow["inputs"]["issue_description"])
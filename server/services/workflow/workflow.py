@@ -1,157 +1,292 @@
+import asyncio
 import logging
 import json # <-- Make sure json is imported at the top
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 from crewai import Crew, Process, Task
-from nodes import (
+from services.workflow.nodes import (
     # Make sure your imports match the nodes you are using
-    NODE_REGISTRY, BaseNode, InputNode, OutputNode, ActionBlockNode,
-    AutomationAgentNode, DecisionPointNode, RoomCreationNode, EscalationTriggerNode,
-    DocumentVerificationNode
+    BaseNode, InputNode, OutputNode, ActionBlockNode, DecisionPointNode, RoomCreationNode,
+    EscalationTriggerNode, DocumentVerificationNode, JoinNode
 )
+from core.config import settings
+from services.workflow.checkpoints import RunCheckpoints, apply_diff, context_diff
+from services.workflow.plan import Edge, WorkflowPlan, compile_plan, content_key, plan_cache
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("services.workflow.workflow")
+
+# Sync CrewAI kickoffs from DAG-mode runs; bounds concurrent LLM calls.
+workflow_executor = ThreadPoolExecutor(max_workers=settings.workflow_max_threads, thread_name_prefix="workflow")
+
+
+class _Fork(NamedTuple):
+    """
+    A DAG-mode node whose context was handed to several branches: that
+    context, and the fork the node itself ran under.
+    """
+    base: Dict[str, Any]
+    parent: Optional["_Fork"]
+
+
+def _common_fork(forks: List[Optional[_Fork]]) -> Optional[_Fork]:
+    """
+    The innermost fork shared by every branch, i.e. the one a join closes.
+    """
+    def chain(fork: Optional[_Fork]):
+        while fork is not None:
+            yield fork
+            fork = fork.parent
+
+    others = [{id(f) for f in chain(fork)} for fork in forks[1:]]
+    for fork in chain(forks[0]):
+        if all(id(fork) in ids for ids in others):
+            return fork
+    return None
+
+
+def _merge_branches(branches: List[Tuple[Dict[str, Any], Optional[_Fork]]]) -> Tuple[Dict[str, Any], Optional[_Fork]]:
+    """
+    Join branch contexts: start from the context at their common fork and
+    apply what each branch set or removed since then, in order. A branch
+    that left a key alone never overwrites another branch's change to it.
+    """
+    if len(branches) == 1:
+        return branches[0]
+    fork = _common_fork([branch_fork for _, branch_fork in branches])
+    base = fork.base if fork is not None else {}
+    merged = dict(base)
+    for context, _ in branches:
+        apply_diff(merged, context_diff(base, context))
+    return merged, fork
 
 class WorkflowManager:
+    """
+    Per-run state (the context) on top of a shared, compiled WorkflowPlan.
+    Building one is cheap once the plan is cached; use `from_plan` when
+    the caller already has the plan.
+    """
+
     def __init__(self, nodes_data: List[Dict], edges_data: List[Dict]):
-        self.nodes: Dict[str, BaseNode] = self._load_nodes(nodes_data)
-        self.context: Dict[str, Any] = {}
+        key = content_key(nodes_data, edges_data)
+        self._bind(plan_cache.get_or_compile(key, lambda: compile_plan(nodes_data, edges_data)))
 
-        # The 'edges' are the core of the workflow's structure.
-        self.edges: Dict[str, List[Dict]] = self._build_edge_map(edges_data)
-        
-        # CORRECTED: The workflow now starts with an 'inputNode'.
-        self.input_node_id = self._find_node_by_type("inputNode")
-        
-        self.agents = {
-            node.id: node.to_crewai_agent()
-            for node in self.nodes.values() if isinstance(node, AutomationAgentNode)
-        }
-
-    def _load_nodes(self, nodes_data: List[Dict]) -> Dict[str, BaseNode]:
-        loaded_nodes = {}
-        for node_data in nodes_data:
-            node_type = node_data.get("type")
-            node_class = NODE_REGISTRY.get(node_type)
-            if not node_class: raise ValueError(f"Unknown node type: {node_type}")
-            combined_data = {**node_data, **node_data.get('data', {})}
-            loaded_nodes[node_data['id']] = node_class(**combined_data)
-        return loaded_nodes
-
-    def _build_edge_map(self, edges_data: List[Dict]) -> Dict[str, List[Dict]]:
-        edge_map = {}
-        for edge in edges_data:
-            source_id = edge['source']
-            if source_id not in edge_map:
-                edge_map[source_id] = []
-            edge_map[source_id].append(edge)
-        return edge_map
-
-    def _find_node_by_type(self, node_type: str) -> str:
-        for node_id, node in self.nodes.items():
-            if node.type == node_type: return node_id
-        raise ValueError(f"Workflow is missing a '{node_type}'")
+    @classmethod
+    def from_plan(cls, plan: WorkflowPlan) -> "WorkflowManager":
+        manager = cls.__new__(cls)
+        manager._bind(plan)
+        return manager
+
+    def _bind(self, plan: WorkflowPlan) -> None:
+        self.plan = plan
+        self.nodes = plan.nodes
+        self.agents = plan.agents
+        self.input_node_id = plan.input_node_id
+        self.context: Dict[str, Any] = {}
 
     def _find_next_node_id(self, source_node_id: str, source_handle: str = None) -> str | None:
-        connections = self.edges.get(source_node_id, [])
-        if not connections:
-            return None
-        
-        if source_handle:
-            for edge in connections:
-                if edge.get('sourceHandle') == source_handle:
-                    return edge['target']
-            return None
-        else:
-            return connections[0]['target']
+        return self.plan.next_node_id(source_node_id, source_handle)
+
+    def _execute_node(self, node: BaseNode, context: Dict[str, Any]) -> Optional[str]:
+        """
+        Runs one node against `context`, storing its output there. Returns
+        the handle ('true'/'false') to follow for branching nodes, else None.
+        """
+        logger.info(f"Executing node: {node.id} (Type: {node.type})")
+
+        if isinstance(node, (InputNode, JoinNode)):
+            pass
+
+        elif isinstance(node, ActionBlockNode):
+            template = self.agents.get(node.agent_id)
+            if not template: raise ValueError(f"Agent '{node.agent_id}' not found")
+            # The plan's agent is shared by every run; execute on a copy.
+            agent = template.copy()
+
+            task = Task(description=node.description.format(**context),
+                        expected_output=node.expected_output.format(**context),
+                        agent=agent)
+            crew = Crew(agents=[agent], tasks=[task], process=Process.sequential)
+            result = crew.kickoff()
+
+            # Try to parse the output as JSON. If it fails, use the raw string.
+            try:
+                context[f"output_{node.id}"] = json.loads(result.raw)
+                logger.info(f"Action result for '{node.id}' (JSON) stored in context.")
+            except json.JSONDecodeError:
+                context[f"output_{node.id}"] = result.raw
+                logger.info(f"Action result for '{node.id}' (Raw Text) stored in context.")
+
+        elif isinstance(node, DecisionPointNode):
+            try:
+                result = self.plan.conditions[node.id](context)
+                logger.info(f"Decision '{node.condition}' evaluated to: {result}")
+            except Exception as e:
+                logger.error(f"Error evaluating condition '{node.condition}': {e}")
+                result = False
+            return 'true' if result else 'false'
+
+        elif isinstance(node, DocumentVerificationNode):
+            doc_path = node.document_path.format(**context)
+            prompt = node.verification_prompt
+            logger.info(f"SIMULATING verification for '{doc_path}' with prompt: '{prompt}'")
+            result = 'signature' in prompt.lower()
+            context[f"output_{node.id}"] = {"verified": result, "document": doc_path}
+            return 'true' if result else 'false'
 
-    def run(self, initial_inputs: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Executes the workflow by traversing the graph from the InputNode."""
+        elif isinstance(node, RoomCreationNode):
+            room_name = node.room_name.format(**context)
+            context[f"output_{node.id}"] = {"status": "created", "room_name": room_name}
+
+        elif isinstance(node, EscalationTriggerNode):
+            context['escalation_reason'] = node.reason.format(**context)
+
+        return None
+
+    def _step(self, node: BaseNode, context: Dict[str, Any], checkpoints: Optional[RunCheckpoints]) -> Optional[str]:
+        """
+        `_execute_node` with checkpointing: a visit completed by an earlier
+        attempt is replayed from its checkpoint instead of executed again.
+        """
+        if checkpoints is None:
+            return self._execute_node(node, context)
+        done = checkpoints.replay(node.id)
+        if done is not None:
+            logger.info(f"Replaying node from checkpoint: {node.id} (Type: {node.type})")
+            apply_diff(context, done)
+            return done.handle
+        before = dict(context)
+        handle_id = self._execute_node(node, context)
+        checkpoints.record(node.id, handle_id, before, context)
+        return handle_id
+
+    @staticmethod
+    def _render_output(node: OutputNode, context: Dict[str, Any]) -> Dict[str, Any]:
+        final_data = {}
+        for output_def in node.outputs:
+            output_name = output_def.get("name")
+            value_template = output_def.get("value")
+            if output_name and value_template:
+                try:
+                    final_data[output_name] = value_template.format(**context)
+                except KeyError:
+                    final_data[output_name] = None
+        return final_data
+
+    def run(self, initial_inputs: Dict[str, Any] = None, checkpoints: Optional[RunCheckpoints] = None) -> Dict[str, Any]:
+        """
+        Executes the workflow by traversing the graph from the InputNode.
+        With `checkpoints`, each completed node is recorded and nodes
+        completed by an earlier attempt are replayed.
+        """
         if not self.input_node_id:
             return {"status": "error", "message": "Input node not found."}
 
-        self.context = initial_inputs or {}
+        self.context = dict(initial_inputs or {})
         current_node_id = self.input_node_id
-        
-        # CORRECTED: The loop now correctly terminates when it reaches an OutputNode.
+
         while current_node_id and not isinstance(self.nodes.get(current_node_id), OutputNode):
-            node = self.nodes.get(current_node_id)
-            logging.info(f"Executing node: {node.id} (Type: {node.type})")
-            
-            next_node_id = self._find_next_node_id(current_node_id)
-
-            # --- NODE EXECUTION LOGIC ---
-            if isinstance(node, InputNode):
-                pass
-
-                        # =================== THIS IS THE UPDATED SECTION ===================
-            elif isinstance(node, ActionBlockNode):
-                agent = self.agents.get(node.agent_id)
-                if not agent: raise ValueError(f"Agent '{node.agent_id}' not found")
-                
-                task = Task(description=node.description.format(**self.context),
-                            expected_output=node.expected_output.format(**self.context),
-                            agent=agent)
-                crew = Crew(agents=[agent], tasks=[task], process=Process.sequential)
-                result = crew.kickoff()
-                
-                # Try to parse the output as JSON. If it fails, use the raw string.
-                try:
-                    parsed_output = json.loads(result.raw)
-                    self.context[f"output_{node.id}"] = parsed_output
-                    logging.info(f"Action result for '{node.id}' (JSON) stored in context.")
-                except json.JSONDecodeError:
-                    self.context[f"output_{node.id}"] = result.raw
-                    logging.info(f"Action result for '{node.id}' (Raw Text) stored in context.")
-            # ===================================================================
-            
-            elif isinstance(node, DecisionPointNode):
-                try:
-                    # CORRECTED: Pass the 'json' module to eval's context
-                    result = eval(node.condition, {"json": json}, {"context": self.context})
-                    logging.info(f"Decision '{node.condition}' evaluated to: {result}")
-                except Exception as e:
-                    logging.error(f"Error evaluating condition '{node.condition}': {e}")
-                    result = False
-                
-                handle_id = 'true' if result else 'false'
-                next_node_id = self._find_next_node_id(current_node_id, handle_id)
-
-            elif isinstance(node, DocumentVerificationNode):
-                doc_path = node.document_path.format(**self.context)
-                prompt = node.verification_prompt
-                logging.info(f"SIMULATING verification for '{doc_path}' with prompt: '{prompt}'")
-                result = 'signature' in prompt.lower()
-                self.context[f"output_{node.id}"] = {"verified": result, "document": doc_path}
-                handle_id = 'true' if result else 'false'
-                next_node_id = self._find_next_node_id(current_node_id, handle_id)
-
-            elif isinstance(node, RoomCreationNode):
-                room_name = node.room_name.format(**self.context)
-                self.context[f"output_{node.id}"] = {"status": "created", "room_name": room_name}
-
-            elif isinstance(node, EscalationTriggerNode):
-                reason = node.reason.format(**self.context)
-                self.context['escalation_reason'] = reason
-
-            current_node_id = next_node_id
+            handle_id = self._step(self.nodes.get(current_node_id), self.context, checkpoints)
+            current_node_id = self._find_next_node_id(current_node_id, handle_id)
             if not current_node_id:
-                logging.warning("Workflow path terminated unexpectedly.")
+                logger.warning("Workflow path terminated unexpectedly.")
                 break
-        
+
         if current_node_id and isinstance(self.nodes.get(current_node_id), OutputNode):
-            final_output_node = self.nodes.get(current_node_id)
-            logging.info(f"Reached Output Node: {final_output_node.id}")
-            final_data = {}
-            for output_def in final_output_node.outputs:
-                output_name = output_def.get("name")
-                value_template = output_def.get("value")
-                if output_name and value_template:
-                    try:
-                        # CORRECTED: No need for json here anymore.
-                        final_data[output_name] = value_template.format(**self.context)
-                    except KeyError as e:
-                        final_data[output_name] = None
-            
-            return {"status": "completed", "output": final_data}
+            logger.info(f"Reached Output Node: {current_node_id}")
+            return {"status": "completed", "output": self._render_output(self.nodes[current_node_id], self.context)}
         else:
-            return {"status": "terminated", "final_context": self.context}
\ No newline at end of file
+            return {"status": "terminated", "final_context": self.context}
+
+    async def run_dag(self, initial_inputs: Dict[str, Any] = None, checkpoints: Optional[RunCheckpoints] = None) -> Dict[str, Any]:
+        """
+        Executes the workflow as a DAG: every node whose inputs are ready
+        runs concurrently, so independent branches overlap and latency is
+        that of the longest branch. ActionBlock kickoffs run on the
+        bounded `workflow_executor` thread pool.
+
+        A node with several outgoing edges starts all of them (branching
+        nodes only the edges of their 'true'/'false' handle); each branch
+        gets its own copy of the context. A JoinNode waits until every
+        incoming branch has finished or been ruled out, then applies each
+        branch's changes since the fork point in edge order; any other
+        node starts on the first branch that reaches it. Outputs of every OutputNode reached are merged.
+        `checkpoints` works as in `run`.
+        """
+        plan = self.plan
+        if plan.dag_error:
+            raise ValueError(plan.dag_error)
+        loop = asyncio.get_running_loop()
+
+        remaining = {node_id: len(edges) for node_id, edges in plan.incoming.items()}
+        arrived: Dict[str, Dict[int, Tuple[Dict[str, Any], Optional[_Fork]]]] = {}
+        resolved: set = set()
+        finished: Dict[str, Dict[str, Any]] = {}
+        running: Dict[asyncio.Future, Tuple[str, Dict[str, Any], Optional[_Fork]]] = {}
+
+        async def execute(node: BaseNode, context: Dict[str, Any]) -> Optional[str]:
+            if isinstance(node, ActionBlockNode) and not (checkpoints and checkpoints.peek(node.id)):
+                return await loop.run_in_executor(workflow_executor, self._step, node, context, checkpoints)
+            return self._step(node, context, checkpoints)
+
+        def start(node_id: str, context: Dict[str, Any], fork: Optional[_Fork]) -> None:
+            resolved.add(node_id)
+            if isinstance(plan.nodes[node_id], OutputNode):
+                logger.info(f"Reached Output Node: {node_id}")
+                finished[node_id] = context
+            else:
+                running[asyncio.ensure_future(execute(plan.nodes[node_id], context))] = (node_id, context, fork)
+
+        def skip(node_id: str) -> None:
+            resolved.add(node_id)
+            for edge in plan.edges.get(node_id, ()):
+                follow(edge, None, None)
+
+        def follow(edge: Edge, context: Optional[Dict[str, Any]], fork: Optional[_Fork]) -> None:
+            # `context` is None when the edge is not taken.
+            target = edge.target
+            if target in resolved:
+                return
+            if context is not None and not isinstance(plan.nodes[target], JoinNode):
+                start(target, dict(context), fork)
+                return
+            remaining[target] -= 1
+            if context is not None:
+                arrived.setdefault(target, {})[plan.incoming[target].index(edge)] = (context, fork)
+            if remaining[target] == 0:
+                branches = arrived.pop(target, None)
+                if branches:
+                    start(target, *_merge_branches([branches[position] for position in sorted(branches)]))
+                else:
+                    skip(target)
+
+        start(plan.input_node_id, dict(initial_inputs or {}), None)
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    node_id, context, fork = running.pop(future)
+                    handle_id = future.result()
+                    finished[node_id] = context
+                    edges = plan.edges.get(node_id, ())
+                    taken = [edge for edge in edges if handle_id is None or edge.source_handle == handle_id]
+                    if len(taken) > 1:
+                        # Branches copy `context`, which is not changed again.
+                        fork = _Fork(context, fork)
+                    for edge in edges:
+                        follow(edge, context if edge in taken else None, fork)
+        except BaseException:
+            for future in running:
+                future.cancel()
+            raise
+
+        outputs = [node_id for node_id in plan.nodes if node_id in finished and isinstance(plan.nodes[node_id], OutputNode)]
+        self.context = {}
+        for node_id in outputs or [node_id for node_id in plan.nodes if node_id in finished]:
+            self.context.update(finished[node_id])
+        if not outputs:
+            logger.warning("Workflow reached no Output Node.")
+            return {"status": "terminated", "final_context": self.context}
+        final_data = {}
+        for node_id in outputs:
+            final_data.update(self._render_output(plan.nodes[node_id], finished[node_id]))
+        return {"status": "completed", "output": final_data}
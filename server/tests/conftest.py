@@ -0,0 +1,24 @@
+"""
+Every test session runs against its own throwaway SQLite database. The
+environment has to be set before anything imports core.config.
+"""
+import asyncio
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+os.environ["DB_PROFILE"] = "test"
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def engine():
+    from db import migrations
+    from db.session import async_engine, engine
+
+    migrations.upgrade(engine)
+    yield engine
+    engine.dispose()
+    # Pooled aiosqlite connections each hold a thread open.
+    asyncio.run(async_engine.dispose())
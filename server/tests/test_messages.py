@@ -0,0 +1,80 @@
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from api.v1.endpoints import messages
+from core.dependencies import get_current_active_user
+from core.permissions import permission_resolver
+from db.models import Message, Role, Ticket, User
+from db.session import async_engine
+
+
+@pytest.fixture(scope="module")
+def people(engine):
+    with Session(engine) as session:
+        admin_role, user_role = Role(name="Admin"), Role(name="Customer")
+        session.add_all([admin_role, user_role])
+        session.flush()
+        admin = User(email="admin@messages.test", password_hash="x", full_name="Admin", status="active", role_id=admin_role.id)
+        owner = User(email="owner@messages.test", password_hash="x", full_name="Owner", status="active", role_id=user_role.id)
+        other = User(email="other@messages.test", password_hash="x", full_name="Other", status="active", role_id=user_role.id)
+        session.add_all([admin, owner, other])
+        session.flush()
+        for user, count in ((owner, 5), (other, 3)):
+            ticket = Ticket(user_id=user.id, subject=f"{user.full_name}'s ticket")
+            session.add(ticket)
+            session.flush()
+            session.add_all(Message(ticket_id=ticket.id, sender_type="user", body=f"#{i}") for i in range(count))
+        session.commit()
+        permission_resolver.compile(session)
+        for user in (admin, owner, other):
+            session.refresh(user)
+            session.expunge(user)
+    return {"admin": admin, "owner": owner, "other": other}
+
+
+@pytest.fixture(scope="module")
+def client(people):
+    app = FastAPI()
+    app.include_router(messages.router, prefix="/messages")
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def selects():
+    statements: List[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.mark.parametrize("caller, visible", [("admin", 8), ("owner", 5)])
+def test_read_messages_runs_one_select_per_page(client, people, selects, caller, visible):
+    client.app.dependency_overrides[get_current_active_user] = lambda: people[caller]
+    seen, pages, cursor = [], 0, None
+    while True:
+        selects.clear()
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/messages/", params=params)
+        assert response.status_code == 200
+        assert len(selects) == 1, selects
+        seen += response.json()
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(seen) == visible
+    assert pages == (visible + 1) // 2
+    if caller == "owner":
+        owned = {m["ticket_id"] for m in seen}
+        assert len(owned) == 1
@@ -0,0 +1,33 @@
+import pytest
+
+from db import migrations
+from db.models import Ticket
+
+
+def test_schema_is_at_the_latest_version(engine):
+    assert migrations.upgrade(engine) == []
+    assert migrations.is_current(engine)
+
+
+@pytest.mark.parametrize("name", sorted(migrations.EXPECTED_PLANS))
+def test_hot_query_uses_its_index(engine, name):
+    with engine.connect() as conn:
+        ok, plan = migrations.explain_hot_queries(conn)[name]
+    assert ok, f"expected {migrations.EXPECTED_PLANS[name][1]}, got: {plan}"
+
+
+def test_explain_notices_a_dropped_index(engine):
+    index = next(i for i in Ticket.__table__.indexes if i.name == "ix_ticket_status_updated_at")
+    # sqlite3 caches prepared statements per connection, and a cached
+    # EXPLAIN does not notice schema changes; start from fresh connections.
+    engine.dispose()
+    try:
+        with engine.begin() as conn:
+            index.drop(conn)
+        with engine.connect() as conn:
+            ok, plan = migrations.explain_hot_queries(conn)["recently updated tickets by status"]
+        assert not ok, plan
+    finally:
+        with engine.begin() as conn:
+            index.create(conn)
+        engine.dispose()
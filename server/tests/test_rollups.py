@@ -0,0 +1,85 @@
+import asyncio
+import datetime
+
+from sqlalchemy import select
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from db import rollups
+from db.models import Role, Ticket, User
+from db.session import async_engine
+
+T0 = datetime.datetime(2026, 3, 2, 9, 15)
+
+
+def hourly(engine):
+    with engine.connect() as conn:
+        rows = conn.execute(select(rollups.hourly_table)).mappings().all()
+    return {row["bucket"]: (row["created"], row["closed"]) for row in rows if row["created"] or row["closed"]}
+
+
+def statuses(engine):
+    with engine.connect() as conn:
+        rows = conn.execute(select(rollups.status_table)).all()
+    return {status: count for status, count in rows if count}
+
+
+def rebuilt(engine):
+    with engine.begin() as conn:
+        rollups.rebuild(conn)
+    return hourly(engine), statuses(engine)
+
+
+def run(step):
+    async def main():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            await step(session)
+            await session.commit()
+    asyncio.run(main())
+
+
+def test_edited_closed_ticket_is_uncounted_from_its_close_hour(engine):
+    with Session(engine) as session:
+        role = Role(name="Rollups")
+        session.add(role)
+        session.flush()
+        user = User(email="rollups@test", password_hash="x", full_name="Rollups", status="active", role_id=role.id)
+        session.add(user)
+        session.commit()
+        user_id = user.id
+    rebuilt(engine)
+    before = hourly(engine), statuses(engine)
+
+    ticket = Ticket(user_id=user_id, subject="Printer", created_at=T0, updated_at=T0)
+
+    async def create(session):
+        session.add(ticket)
+        await session.flush()
+        await rollups.record_ticket_created(session, ticket)
+
+    async def change(session, old_status, status, at):
+        ticket.status, ticket.updated_at = status, at
+        session.add(ticket)
+        await rollups.record_status_change(session, ticket, old_status, at)
+
+    run(create)
+    for old_status, status, hours in (("open", "closed", 1), ("closed", "open", 2), ("open", "closed", 3)):
+        run(lambda session: change(session, old_status, status, T0 + datetime.timedelta(hours=hours)))
+    # Closed at T0+3h; an unrelated edit much later moves only updated_at.
+    ticket.updated_at = T0 + datetime.timedelta(hours=7)
+    run(lambda session: session.merge(ticket))
+
+    incremental = hourly(engine), statuses(engine)
+    assert incremental[0][rollups.hour_bucket(T0 + datetime.timedelta(hours=3))] == (0, 1)
+    assert incremental == rebuilt(engine)
+
+    async def delete(session):
+        row = await session.get(Ticket, ticket.id)
+        await rollups.record_ticket_deleted(session, row)
+        await session.delete(row)
+
+    run(delete)
+    after = hourly(engine), statuses(engine)
+    assert all(created >= 0 and closed >= 0 for created, closed in after[0].values())
+    assert after == before
+    assert after == rebuilt(engine)
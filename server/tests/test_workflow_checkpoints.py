@@ -0,0 +1,100 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from sqlalchemy import insert  # noqa: E402
+
+from db.group_commit import GroupCommitWriter  # noqa: E402
+from db.models import User, WorkflowCheckpoint, WorkflowRun  # noqa: E402
+from db.session import async_engine  # noqa: E402
+from services.workflow.checkpoints import RunCheckpoints  # noqa: E402
+from services.workflow.plan import compile_plan  # noqa: E402
+from services.workflow.workflow import WorkflowManager  # noqa: E402
+
+# grow -> room -> check loops back to grow until escalation_reason is 'xxx'.
+NODES = [
+    {"id": "in", "type": "inputNode", "data": {}},
+    {"id": "grow", "type": "escalationTrigger", "data": {"reason": "x{escalation_reason}"}},
+    {"id": "room", "type": "roomCreation", "data": {"room_name": "room-{escalation_reason}"}},
+    {"id": "check", "type": "decisionPoint", "data": {"condition": "context['escalation_reason'] == 'xxx'"}},
+    {"id": "out", "type": "outputNode", "data": {"outputs": [{"name": "room", "value": "{output_room[room_name]}"}]}},
+]
+EDGES = [
+    {"source": "in", "target": "grow"},
+    {"source": "grow", "target": "room"},
+    {"source": "room", "target": "check"},
+    {"source": "check", "target": "out", "sourceHandle": "true"},
+    {"source": "check", "target": "grow", "sourceHandle": "false"},
+]
+
+
+class RecordingManager(WorkflowManager):
+    """
+    Logs executed nodes, can crash on a given visit of a node, and gives up
+    instead of looping forever.
+    """
+
+    crash_at = None
+
+    def _step(self, node, context, checkpoints):
+        self.steps += 1
+        if self.steps > 50:
+            raise AssertionError("workflow did not terminate")
+        return super()._step(node, context, checkpoints)
+
+    def _execute_node(self, node, context):
+        self.visits[node.id] += 1
+        if (node.id, self.visits[node.id]) == self.crash_at:
+            raise RuntimeError(f"crash in {node.id}")
+        self.executed.append(node.id)
+        return super()._execute_node(node, context)
+
+
+def manager(crash_at=None) -> RecordingManager:
+    recording = RecordingManager.from_plan(compile_plan(NODES, EDGES))
+    recording.crash_at, recording.steps, recording.visits, recording.executed = crash_at, 0, Counter(), []
+    return recording
+
+
+def test_resume_inside_a_loop_replays_each_visit_once(engine):
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            insert(User).values(email="checkpoints@test", password_hash="x", full_name="Checkpoints")
+        ).inserted_primary_key[0]
+        run_id = conn.execute(
+            insert(WorkflowRun).values(submitted_by=user_id, graph_json="{}", inputs={})
+        ).inserted_primary_key[0]
+
+    writer = GroupCommitWriter(async_engine, WorkflowCheckpoint, max_rows=64, max_delay_ms=1, max_pending=1000)
+
+    async def attempt(recording):
+        loop = asyncio.get_running_loop()
+        async with async_engine.connect() as conn:
+            checkpoints = await RunCheckpoints.load(conn, run_id, writer)
+        try:
+            return await loop.run_in_executor(None, recording.run, {"escalation_reason": ""}, checkpoints)
+        finally:
+            await checkpoints.flush()
+
+    async def main():
+        await writer.start()
+        try:
+            first = manager(crash_at=("room", 2))
+            with pytest.raises(RuntimeError):
+                await attempt(first)
+            assert first.executed == ["in", "grow", "room", "check", "grow"]
+
+            second = manager()
+            result = await attempt(second)
+        finally:
+            await writer.stop()
+        # Everything before the crash is replayed; the loop carries on from
+        # the second visit of `room`.
+        assert second.executed == ["room", "check", "grow", "room", "check"]
+        assert second.context["escalation_reason"] == "xxx"
+        assert result == {"status": "completed", "output": {"room": "room-xxx"}}
+
+    asyncio.run(main())
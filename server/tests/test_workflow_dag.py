@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from services.workflow.plan import compile_plan  # noqa: E402
+from services.workflow.workflow import WorkflowManager  # noqa: E402
+
+
+def run_dag(nodes, edges, inputs):
+    manager = WorkflowManager.from_plan(compile_plan(nodes, edges))
+    return asyncio.run(manager.run_dag(inputs))
+
+
+def test_join_keeps_a_change_made_by_only_one_branch():
+    nodes = [
+        {"id": "in", "type": "inputNode", "data": {}},
+        {"id": "escalate", "type": "escalationTrigger", "data": {"reason": "{name} is a VIP"}},
+        {"id": "room", "type": "roomCreation", "data": {"room_name": "room-{name}"}},
+        {"id": "join", "type": "joinNode", "data": {}},
+        {"id": "out", "type": "outputNode", "data": {"outputs": [
+            {"name": "why", "value": "{escalation_reason}"},
+            {"name": "room", "value": "{output_room[room_name]}"},
+        ]}},
+    ]
+    edges = [
+        {"source": "in", "target": "escalate"},
+        {"source": "in", "target": "room"},
+        {"source": "escalate", "target": "join"},
+        {"source": "room", "target": "join"},
+        {"source": "join", "target": "out"},
+    ]
+    # The second branch still carries the original escalation_reason.
+    result = run_dag(nodes, edges, {"name": "ann", "escalation_reason": "none"})
+    assert result == {"status": "completed", "output": {"why": "ann is a VIP", "room": "room-ann"}}
+
+
+def test_join_of_nested_forks_merges_against_the_outer_fork():
+    nodes = [
+        {"id": "in", "type": "inputNode", "data": {}},
+        {"id": "escalate", "type": "escalationTrigger", "data": {"reason": "{name} is a VIP"}},
+        {"id": "room-a", "type": "roomCreation", "data": {"room_name": "a-{escalation_reason}"}},
+        {"id": "room-b", "type": "roomCreation", "data": {"room_name": "b-{name}"}},
+        {"id": "room-c", "type": "roomCreation", "data": {"room_name": "c-{name}"}},
+        {"id": "join", "type": "joinNode", "data": {}},
+        {"id": "out", "type": "outputNode", "data": {"outputs": [
+            {"name": "why", "value": "{escalation_reason}"},
+            {"name": "rooms", "value": "{output_room-a[room_name]},{output_room-b[room_name]},{output_room-c[room_name]}"},
+        ]}},
+    ]
+    edges = [
+        {"source": "in", "target": "escalate"},
+        {"source": "in", "target": "room-c"},
+        {"source": "escalate", "target": "room-a"},
+        {"source": "escalate", "target": "room-b"},
+        {"source": "room-a", "target": "join"},
+        {"source": "room-b", "target": "join"},
+        {"source": "room-c", "target": "join"},
+        {"source": "join", "target": "out"},
+    ]
+    result = run_dag(nodes, edges, {"name": "ann", "escalation_reason": "none"})
+    assert result["output"] == {"why": "ann is a VIP", "rooms": "a-ann is a VIP,b-ann,c-ann"}
@@ -0,0 +1,78 @@
+import asyncio
+import datetime
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from sqlalchemy import insert, select, update  # noqa: E402
+
+from db.models import User, WorkflowRun  # noqa: E402
+from db.session import async_engine  # noqa: E402
+from services.workflow.runner import QUEUED, RUNNING, WorkflowWorkerPool  # noqa: E402
+
+GRAPH = '{"nodes": [{"id": "in", "type": "inputNode", "data": {}}], "edges": []}'
+
+
+def test_only_expired_leases_are_requeued(engine):
+    now = datetime.datetime.utcnow()
+    leases = {
+        "live": ("other-host:1:a", now),
+        "expired": ("other-host:2:b", now - datetime.timedelta(minutes=5)),
+        "legacy": (None, None),
+    }
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            insert(User).values(email="leases@test", password_hash="x", full_name="Leases")
+        ).inserted_primary_key[0]
+        run_ids = {
+            name: conn.execute(
+                insert(WorkflowRun).values(
+                    submitted_by=user_id, graph_json=GRAPH, inputs={},
+                    status=RUNNING, worker_id=worker_id, heartbeat_at=heartbeat_at,
+                )
+            ).inserted_primary_key[0]
+            for name, (worker_id, heartbeat_at) in leases.items()
+        }
+
+    pool = WorkflowWorkerPool(async_engine, concurrency=1, lease_seconds=30)
+
+    async def main():
+        async with async_engine.begin() as conn:
+            return await pool._requeue_expired(conn)
+
+    assert asyncio.run(main()) == [run_ids["expired"], run_ids["legacy"]]
+    with engine.connect() as conn:
+        status = dict(conn.execute(
+            select(WorkflowRun.id, WorkflowRun.status).where(WorkflowRun.id.in_(run_ids.values()))
+        ).all())
+    assert status == {run_ids["live"]: RUNNING, run_ids["expired"]: QUEUED, run_ids["legacy"]: QUEUED}
+
+
+def test_a_worker_that_lost_its_lease_does_not_overwrite_the_run(engine):
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            insert(User).values(email="lost-lease@test", password_hash="x", full_name="Lost lease")
+        ).inserted_primary_key[0]
+        run_id = conn.execute(
+            insert(WorkflowRun).values(submitted_by=user_id, graph_json=GRAPH, inputs={})
+        ).inserted_primary_key[0]
+
+    first = WorkflowWorkerPool(async_engine, concurrency=1)
+    second = WorkflowWorkerPool(async_engine, concurrency=1)
+    first.worker_id, second.worker_id = "first", "second"
+
+    async def main():
+        assert await first._claim(run_id)
+        # The lease expired and another pool took the run over.
+        async with async_engine.begin() as conn:
+            await conn.execute(
+                update(WorkflowRun).where(WorkflowRun.id == run_id).values(status=QUEUED, worker_id=None)
+            )
+        assert await second._claim(run_id)
+        await first._execute(run_id)
+
+    asyncio.run(main())
+    with engine.connect() as conn:
+        run = conn.execute(select(WorkflowRun).where(WorkflowRun.id == run_id)).one()
+    assert (run.status, run.worker_id, run.finished_at) == (RUNNING, "second", None)